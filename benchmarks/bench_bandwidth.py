@@ -0,0 +1,52 @@
+"""
+Speed and accuracy benchmark of the binned cross-validation of bwEstimation
+
+Von Mises samples, with and without an isolated outlier, are fitted with
+method='cv' and method='cv_binned', and the benchmark fails if the binned
+bandwidth differs by more than --tolerance from the exact one, or if the
+outlier moves the binned bandwidth to the upper bound.
+
+Usage, with pycircular installed or from the root of the repository::
+
+    PYTHONPATH=. python benchmarks/bench_bandwidth.py [--samples 5000] [--kappa 50] [--tolerance 0.05]
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from pycircular.circular import bwEstimation
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--samples', type=int, default=5000)
+    parser.add_argument('--kappa', type=float, default=50)
+    parser.add_argument('--outlier', type=float, default=4.0)
+    parser.add_argument('--tolerance', type=float, default=0.05)
+    parser.add_argument('--random-state', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.random_state)
+    x = np.mod(rng.vonmises(1, args.kappa, args.samples), 2 * np.pi)
+    cases = [('von Mises', x), ('+ outlier', np.append(x, args.outlier)), ('two samples', np.array([0.1, 3.2]))]
+
+    failed = False
+    for name, sample in cases:
+        bw = {}
+        for method in ('cv', 'cv_binned'):
+            start = time.perf_counter()
+            bw[method] = bwEstimation(sample, method=method)
+            print('%-12s %-10s bw %10.4f %8.3f s' % (name, method, bw[method], time.perf_counter() - start))
+
+        if abs(bw['cv_binned'] - bw['cv']) > args.tolerance * bw['cv']:
+            print('FAILED: the binned bandwidth of %s differs from the exact one' % name)
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Speed benchmark of pycircular.utils.date2rad
+
+Random hours are converted with the list loop that date2rad used before it was
+vectorized, and with date2rad into float64 and float32 out buffers, and the
+benchmark fails if the radians differ from the ones of the loop.
+
+Usage, with pycircular installed or from the root of the repository::
+
+    PYTHONPATH=. python benchmarks/bench_date2rad.py [--samples 10000000] [--repeat 3]
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from pycircular.utils import date2rad
+
+
+def date2rad_loop(dates):
+    """Hours to radians with the former Python loop"""
+    radians = - dates * 2 * np.pi / 24 + np.pi/2
+    radians1 = []
+    for i in radians:
+        if i < 0:
+            radians1.append(i + 2 * np.pi)
+        elif i > 2 * np.pi:
+            radians1.append(i - 2 * np.pi)
+        else:
+            radians1.append(i)
+    return radians1
+
+
+def best_time(func, repeat):
+    """Best time of func in seconds and its result"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--samples', type=int, default=10000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--random-state', type=int, default=0)
+    args = parser.parse_args()
+
+    hours = np.random.default_rng(args.random_state).uniform(0, 24, args.samples)
+    out64 = np.empty(args.samples)
+    out32 = np.empty(args.samples, dtype=np.float32)
+
+    # The loop is slow, it is timed once
+    base, reference = best_time(lambda: date2rad_loop(hours), 1)
+    reference = np.array(reference)
+    print('%-20s %8.3f s' % ('list loop', base))
+
+    failed = False
+    for name, out, atol in (('float64 out=', out64, 1e-12), ('float32 out=', out32, 1e-5)):
+        seconds, radians = best_time(lambda: date2rad(hours, out=out), args.repeat)
+        print('%-20s %8.3f s  speedup %6.1f' % (name, seconds, base / seconds))
+        # Periodic difference, as 2 * pi may be rounded to 0
+        diff = np.abs(np.mod(radians - reference + np.pi, 2 * np.pi) - np.pi)
+        if diff.max() > atol:
+            print('FAILED: the radians of %s differ from the list loop' % name)
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
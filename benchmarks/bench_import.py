@@ -0,0 +1,62 @@
+"""
+Import time benchmark of pycircular
+
+Each module is imported in a fresh interpreter, and the benchmark fails if the
+best import time is above its budget or if a heavy optional dependency is loaded.
+
+Usage::
+
+    python benchmarks/bench_import.py [--repeat 5] [--budget 1.0]
+"""
+import argparse
+import subprocess
+import sys
+from os.path import dirname, abspath
+
+# Modules that the scoring path must not import
+HEAVY = ('matplotlib', 'seaborn', 'statsmodels', 'scipy.stats')
+
+MODULES = ('pycircular', 'pycircular.circular', 'pycircular.training')
+
+CODE = '''
+import sys, time
+t = time.perf_counter()
+import {module}
+print(time.perf_counter() - t)
+print(','.join(name for name in {heavy!r} if name in sys.modules))
+'''
+
+
+def time_import(module, repeat=5):
+    """Best import time of module in seconds and heavy modules it loads"""
+    root = dirname(dirname(abspath(__file__)))
+    best, heavy = float('inf'), ''
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', CODE.format(module=module, heavy=HEAVY)],
+                             cwd=root, capture_output=True, text=True, check=True).stdout.split('\n')
+        best, heavy = min(best, float(out[0])), out[1]
+    return best, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=1.0,
+                        help='maximum import time in seconds of pycircular.circular')
+    args = parser.parse_args()
+
+    failed = False
+    for module in MODULES:
+        seconds, heavy = time_import(module, args.repeat)
+        print('%-22s %6.3f s  %s' % (module, seconds, 'loads ' + heavy if heavy else ''))
+        failed |= bool(heavy)
+        if module == 'pycircular.circular':
+            failed |= seconds > args.budget
+
+    if failed:
+        print('FAILED: budget of %.2f s exceeded or heavy modules imported' % args.budget)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
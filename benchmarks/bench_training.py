@@ -0,0 +1,53 @@
+"""
+Speedup benchmark of the parallel training of pycircular.training
+
+The accounts of make_transactions are trained with train_time_periodic for each
+n_jobs, and the benchmark fails if the risks differ from the ones with n_jobs=1.
+
+Usage, with pycircular installed or from the root of the repository::
+
+    PYTHONPATH=. python benchmarks/bench_training.py [--accounts 2000] [--n-jobs 1 2 4 8 16]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from pycircular.datasets import make_transactions
+from pycircular.training import train_time_periodic
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--accounts', type=int, default=2000)
+    parser.add_argument('--mean-transactions', type=float, default=50)
+    parser.add_argument('--n-jobs', type=int, nargs='+',
+                        default=sorted({1, 2, 4, 8, 16, os.cpu_count()} & set(range(1, os.cpu_count() + 1))))
+    parser.add_argument('--random-state', type=int, default=0)
+    args = parser.parse_args()
+
+    trx = make_transactions(n_accounts=args.accounts, mean_transactions=args.mean_transactions,
+                            random_state=args.random_state)
+    print('%d accounts, %d transactions, %d CPUs' % (args.accounts, trx.shape[0], os.cpu_count()))
+
+    reference, base = None, None
+    for n_jobs in args.n_jobs:
+        start = time.perf_counter()
+        risks = train_time_periodic(trx, idname='user', n_jobs=n_jobs, compact=True)
+        seconds = time.perf_counter() - start
+
+        if reference is None:
+            reference, base = risks, seconds
+        elif not (np.array_equal(reference.accounts, risks.accounts) and
+                  np.array_equal(reference.risks, risks.risks) and
+                  np.array_equal(reference.bw, risks.bw)):
+            print('FAILED: the risks with n_jobs=%d differ from n_jobs=%d' % (n_jobs, args.n_jobs[0]))
+            sys.exit(1)
+
+        print('n_jobs=%-3d %8.2f s  speedup %5.2f' % (n_jobs, seconds, base / seconds))
+
+
+if __name__ == '__main__':
+    main()
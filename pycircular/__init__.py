@@ -24,5 +24,20 @@ You can install ``costcla`` with ``pip``::
 
 __version__ = '0.1.2'
 
+import importlib
+
 from .datasets import *
-from pycircular import stats, plots, circular, utils
+
+# Submodules are imported on first access, e.g. pycircular.plots, so that
+# scoring does not import matplotlib and seaborn
+_submodules = ['stats', 'plots', 'circular', 'utils', 'mixture', 'training']
+
+
+def __getattr__(name):
+    if name in _submodules:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + _submodules)
@@ -5,15 +5,12 @@ Original circular project in gitlab/R7-Projects/circular
 ! _date2rad is different than pycircular.date2rad
 """
 import numpy as np
-from scipy.stats import vonmises
-from scipy.optimize import minimize_scalar
+from scipy.special import i0e, ive, cosm1, logsumexp
 
-import os
-import os.path as op
-import sys
-sys.path.append(op.dirname(op.dirname(op.dirname(op.abspath(__file__)))))
+from .stats import _A1inv
 
-def kernel(x, bw=10, n=256):
+
+def kernel(x, bw=10, n=256, method='loop'):
     """Estimate the von Mises kernel
 
     Parameters
@@ -25,13 +22,31 @@ def kernel(x, bw=10, n=256):
 
     n : number of points of the kernel
 
+    method : string of values ['loop', 'fft']
+        'loop' repositions one von Mises per sample in a [n_samples, n] matrix.
+        'fft' bins the samples onto the n points of the kernel and circularly
+        convolves the histogram with the von Mises, in O(n_samples + n log n)
+        time and O(n) memory.
+
     Returns
     -------
     y : array-like of shape = [n]
         Calculated von Mises kernel
 
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from pycircular.circular import kernel
+    >>> x = np.array([0.8 ,  1.  ,  1.1 ,  1.15,  4.  ,  4.2 ,  4.3 ,  4.4])
+    >>> y = kernel(x, bw=2, method='fft')
+
     """
 
+    if method == 'fft':
+        return _kernel_fft(x, bw=bw, n=n)
+    elif method != 'loop':
+        raise ValueError("method must be one of ['loop', 'fft']")
+
     #n_samples = x.shape[0]
     n_samples = len(x)
 
@@ -42,7 +57,7 @@ def kernel(x, bw=10, n=256):
     y = np.zeros((n_samples, n))
 
     # As all von Mises are equal so only estimate one
-    p = vonmises.pdf(z, bw)
+    p = _von_mises_pdf(z, bw)
 
     # TODO: calculate in numba or Cython
     for i in range(n_samples):
@@ -66,35 +81,117 @@ def kernel(x, bw=10, n=256):
     return y_kernel
 
 
-def predict_proba(x, y_kernel):
+def _von_mises_pdf(x, kappa):
+    """von Mises pdf centered in 0, as scipy.stats.vonmises.pdf without importing scipy.stats"""
+    return np.exp(kappa * cosm1(x)) / (2 * np.pi * i0e(kappa))
+
+
+def _kernel_fft(x, bw=10, n=256):
+    """Estimate the von Mises kernel by circular convolution
+
+    Same result as kernel(x, bw, n, method='loop'): row i of the loop matrix is
+    the von Mises p rolled to the closest point of x[i], so their sum is the
+    circular convolution of the histogram of the closest points with p.
+
+    Parameters
+    ----------
+    x : array-like of shape = [n_samples] of radians.
+
+    bw : Bandwidth of the kernel estimation
+
+    n : number of points of the kernel
+
+    Returns
+    -------
+    y : array-like of shape = [n]
+        Calculated von Mises kernel
+
+    """
+    x = np.asarray(x, dtype=float)
+    n_samples = x.shape[0]
+
+    # The points of the circumference
+    z = np.linspace(0, np.pi * 2, n)
+    p = _von_mises_pdf(z, bw)
+
+    # Closest point of z for each x, as np.abs(z - x[i]).argmin()
+    idx = _grid_index(x, n)
+    counts = np.bincount(idx, minlength=n)
+
+    y_kernel = np.fft.irfft(np.fft.rfft(counts) * np.fft.rfft(p), n) / n_samples
+
+    # Standarized
+    y_kernel = y_kernel / y_kernel.max()
+
+    return y_kernel
+
+
+def _grid_index(x, n):
+    """Index of the closest point of np.linspace(0, 2 * pi, n) for each x
+
+    Parameters
+    ----------
+    x : array-like of shape = [n_samples] of radians.
+
+    n : number of points of the grid
+
+    Returns
+    -------
+    idx : array-like of shape = [n_samples] of int, 0 for NaN or infinite x,
+        which the callers have to mask
+
+    """
+    step = np.pi * 2 / (n - 1)
+    # Ties go to the lower index, as argmin does
+    idx = np.ceil(np.asarray(x, dtype=float) / step - 0.5)
+    idx = np.where(np.isfinite(idx), idx, 0)
+    return np.clip(idx, 0, n - 1).astype(np.intp)
+
+
+def predict_proba(x, y_kernel, interpolate=False):
     """Estimate the von Mises kernel probablities
 
     Parameters
     ----------
     x : array-like of shape = [n_samples] of radians.
+        np.ndarray, pd.Series or list
     
     y_kernel : array-like of shape = [n]
         Calculated von Mises kernel
 
+    interpolate : bool, whether to interpolate linearly between the points of the kernel
+        instead of taking the closest one
+
     Returns
     -------
     proba : array-like of shape = [n_samples]
-        Calculated von Mises kernel probabilites
+        Calculated von Mises kernel probabilites, NaN for NaN or infinite x
 
     """
-    
-    # find closed value in the kernel
+    y_kernel = np.asarray(y_kernel)
     n = y_kernel.shape[0]
-    z = np.linspace(0, np.pi * 2, n)
-    y_idx = x.apply(lambda x: np.abs(z - x).argmin())
+
+    x = np.asarray(x, dtype=float)
+    # Angles out of [0, 2 * pi] are moved into it
+    out = np.isfinite(x) & ((x < 0) | (x > np.pi * 2))
+    if out.any():
+        x = np.mod(x, np.pi * 2, out=np.array(x), where=out)
+
+    if interpolate:
+        z = np.linspace(0, np.pi * 2, n)
+        return np.where(np.isfinite(x), np.interp(x, z, y_kernel), np.nan)
+
+    # find closed value in the kernel
+    y_idx = _grid_index(x, n)
     
     # return the kernel value
-    prob = y_kernel[(y_idx)]
+    prob = np.where(np.isfinite(x), y_kernel[y_idx], np.nan)
     
     return prob
     
     
-def bwEstimation(x, lower= 0.1, upper= 500, xatol=1e-05):
+def bwEstimation(x, lower= 0.1, upper= 500, xatol=1e-05, max_memory=2**28,
+                 method='cv', grid_size=4096, warm_start=None, warm_factor=4.):
     """Estimate the bandwidth/smoothing parameter for a the von Mises kernel
     based on the bw.cv.ml.pycircular function from  http://www.inside-r.org/packages/cran/circular/docs/bandwidth
 
@@ -105,6 +202,27 @@ def bwEstimation(x, lower= 0.1, upper= 500, xatol=1e-05):
     lower, upper: range over which to minimize for cross validatory bandwidths. The default is almost always
         satisfactory, although it is recommended experiment a little with different ranges.
 
+    max_memory : int, memory budget in bytes of the 'cv' evaluations. The pairwise
+        cos-difference matrix is computed in blocks of rows, as many blocks as fit
+        in the budget are computed once and the rest are recomputed in each evaluation.
+
+    method : string of values ['cv', 'cv_binned', 'taylor', 'rot']
+        'cv' is the exact likelihood cross validation, O(n_samples^2) per evaluation.
+        'cv_binned' bins x onto a circular grid of grid_size points and evaluates the
+        leave-one-out likelihood by FFT convolution of the bin counts, O(grid_size log grid_size)
+        per evaluation independently of n_samples.
+        'taylor' and 'rot' are the O(n_samples) closed form selectors of bwPlugin.
+
+    grid_size : int, number of bins of the 'cv_binned' method.
+        Larger grids are more accurate and slower.
+
+    warm_start : None, string of values ['taylor', 'rot'] or float
+        Initial bandwidth for the cross validation methods, either given or estimated
+        with bwPlugin. The search is restricted to [warm_start / warm_factor, warm_start * warm_factor]
+        within (lower, upper), which reduces the number of cost evaluations.
+
+    warm_factor : float > 1, width of the search bracket around warm_start.
+
     Returns
     -------
     bw : the bw that minimises the squared--error loss and Kullback--Leibler for the Von Mises pdf
@@ -112,12 +230,124 @@ def bwEstimation(x, lower= 0.1, upper= 500, xatol=1e-05):
     """
     if(len(x)<2):
         raise Exception("Need at least 2 data points")
-    bw = minimize_scalar(_costFunction, args=x, bounds=(lower, upper), method="Bounded", 
-                         options={'maxiter': 500, 'xatol': xatol})
+    x = np.asarray(x, dtype=float)
+
+    if method in ('taylor', 'rot'):
+        return np.clip(bwPlugin(x, method=method), lower, upper)
+
+    if method == 'cv':
+        cost, args = _costFunction, (x, _cos_diff_blocks(x, max_memory))
+    elif method == 'cv_binned':
+        cost, args = _costFunctionBinned, _bin_counts(x, grid_size)
+    else:
+        raise ValueError("method must be one of ['cv', 'cv_binned', 'taylor', 'rot']")
+
+    # Deferred, scoring only needs kernel and predict_proba
+    from scipy.optimize import minimize_scalar
+
+    options = {'maxiter': 500, 'xatol': xatol}
+
+    if warm_start is not None:
+        if isinstance(warm_start, str):
+            warm_start = bwPlugin(x, method=warm_start)
+        warm_start = np.clip(warm_start, lower, upper)
+        warm_lower = max(lower, warm_start / warm_factor)
+        warm_upper = min(upper, warm_start * warm_factor)
+        bw = minimize_scalar(cost, args=args, bounds=(warm_lower, warm_upper), method="Bounded",
+                             options=options).x
+
+        # Continue on the rest of the range if the optimum is at the edge of the bracket
+        if bw - warm_lower < 10 * xatol and warm_lower > lower:
+            upper = warm_lower
+        elif warm_upper - bw < 10 * xatol and warm_upper < upper:
+            lower = warm_upper
+        else:
+            return bw
+
+    bw = minimize_scalar(cost, args=args, bounds=(lower, upper), method="Bounded",
+                         options=options)
     return bw.x
 
 
-def _costFunction(bw, x):
+def bwPlugin(x, method='taylor'):
+    """Closed form bandwidth for the von Mises kernel
+
+    Parameters
+    ----------
+    x : array-like of shape = [n_samples] of radians.
+
+    method : string of values ['taylor', 'rot']
+        'taylor' is the plug-in rule of Taylor (2008) for a von Mises population,
+        with the concentration estimated from the mean resultant length.
+        'rot' is a rule of thumb using the circular std s = sqrt(-2 log R) as the
+        std of a normal, h = 1.06 s n_samples^(-1/5), and bw = 1 / h^2.
+
+    Returns
+    -------
+    bw : float, the bandwidth (concentration) of the von Mises kernel
+
+    References
+    ----------
+    .. [1] C. C. Taylor, "Automatic bandwidth selection for circular density
+           estimation", Computational Statistics & Data Analysis, 52(7), 3493-3500, 2008.
+
+    """
+    x = np.asarray(x, dtype=float)
+    n_samples = x.shape[0]
+    R = np.sqrt(np.sin(x).sum() ** 2 + np.cos(x).sum() ** 2) / n_samples
+
+    with np.errstate(divide='ignore'):
+        if method == 'taylor':
+            kappa = _A1inv(R)
+            if np.isinf(kappa):
+                # All the samples are equal
+                return np.inf
+            # I2(2 kappa) / I0(kappa)^2 with exponentially scaled Bessel functions
+            bw = (3 * n_samples * kappa ** 2 * ive(2, 2 * kappa) /
+                  (4 * np.sqrt(np.pi) * i0e(kappa) ** 2)) ** (2 / 5)
+        elif method == 'rot':
+            h = 1.06 * np.sqrt(-2 * np.log(R)) * n_samples ** (-1 / 5)
+            bw = 1 / h ** 2
+        else:
+            raise ValueError("method must be one of ['taylor', 'rot']")
+
+    return float(bw)
+
+
+def _cos_diff_blocks(x, max_memory=2**28):
+    """Split the pairwise cos-difference matrix of x in blocks of rows
+
+    A quarter of max_memory is left for the work buffer of _costFunction, and the
+    blocks that fit in the rest are precomputed.
+
+    Parameters
+    ----------
+    x : array-like of shape = [n_samples] of radians.
+
+    max_memory : int, memory budget in bytes for the cos-difference matrix and
+        the work buffer.
+
+    Returns
+    -------
+    blocks : list of (start, stop, cos_diff)
+        cos_diff is np.cos(x[start:stop, None] - x[None, :]), or None for the blocks
+        that do not fit in max_memory and have to be recomputed.
+
+    """
+    n_samples = x.shape[0]
+    block_size = max(1, min(n_samples, max_memory // (32 * n_samples)))
+    # Number of blocks that fit with the work buffer
+    n_cached = max(0, max_memory - 8 * block_size * n_samples) // (8 * block_size * n_samples)
+
+    blocks = []
+    for i, start in enumerate(range(0, n_samples, block_size)):
+        stop = min(start + block_size, n_samples)
+        cos_diff = np.cos(x[start:stop, None] - x[None, :]) if i < n_cached else None
+        blocks.append((start, stop, cos_diff))
+    return blocks
+
+
+def _costFunction(bw, x, cos_diff=None):
     """
     Cross validatory bandwidths minimizing squared--error loss and Kullback--Leibler loss, respectively
     This is done by minimizing the second and third equations in section 5 of Hall, Watson and Cabrera (1987).
@@ -131,20 +361,340 @@ def _costFunction(bw, x):
 
     x : array-like of shape = [n_samples] of radians.
 
+    cos_diff : list of (start, stop, cos_diff) blocks from _cos_diff_blocks, optional
+
     Returns
     -------
     result: cost of using bw in the log of the  Cross validatory Von Mises pdf
 
     """
-    #n_samples = x.shape[0]
-    n_samples = len(x)
+    x = np.asarray(x, dtype=float)
+    n_samples = x.shape[0]
+
+    if cos_diff is None:
+        cos_diff = _cos_diff_blocks(x)
+
+    # Von Mises pdf exp(bw * cos(x - loc)) / (2 * pi * I0(bw)), scaled by exp(-bw)
+    # on both sides, as scipy.stats.vonmises does, to avoid overflow
+    log_norm = np.log(2 * np.pi * i0e(bw))
+
+    # One work buffer for all the blocks, computed in place
+    work = np.empty((cos_diff[0][1] - cos_diff[0][0], n_samples))
 
     result = np.zeros(n_samples)
-    for i in range(n_samples):
-        result[i] = np.log(vonmises.pdf(np.delete(x,i,0), bw, loc=x[i]).sum(axis=0)/n_samples)
+    for start, stop, block in cos_diff:
+        pdf = work[:stop - start]
+        if block is None:
+            np.subtract(x[start:stop, None], x[None, :], out=pdf)
+            np.cos(pdf, out=pdf)
+            pdf -= 1
+        else:
+            np.subtract(block, 1, out=pdf)
+        pdf *= bw
+        np.exp(pdf, out=pdf)
+        # Leave one out
+        rows = np.arange(stop - start)
+        pdf[rows, rows + start] = 0
+        result[start:stop] = np.log(pdf.sum(axis=1)) - log_norm - np.log(n_samples)
     result = result.sum(axis=0)/n_samples
 
     # 1 / result because Scipy dosent have maximize func
     result = 1 / result
 
     return result
+
+
+def _bin_counts(x, grid_size=4096):
+    """Count x in grid_size bins centered at 2 * pi * k / grid_size
+
+    Parameters
+    ----------
+    x : array-like of shape = [n_samples] of radians.
+
+    grid_size : int, number of bins
+
+    Returns
+    -------
+    counts : array-like of shape = [grid_size]
+
+    """
+    idx = np.rint(np.asarray(x, dtype=float) * grid_size / (2 * np.pi)).astype(np.int64)
+    return np.bincount(idx % grid_size, minlength=grid_size).astype(float)
+
+
+def _costFunctionBinned(bw, counts):
+    """Binned approximation of _costFunction
+
+    The leave-one-out von Mises sum of each sample is approximated by the
+    circular convolution of the bin counts with the von Mises evaluated at the
+    bin centers, minus the contribution of the sample itself.
+
+    Parameters
+    ----------
+    bw : the bandwidth for the Von Mises probability function
+
+    counts : array-like of shape = [grid_size] of bin counts, from _bin_counts
+
+    Returns
+    -------
+    result: cost of using bw in the log of the  Cross validatory Von Mises pdf
+
+    """
+    grid_size = counts.shape[0]
+    n_samples = counts.sum()
+
+    z = np.arange(grid_size) * 2 * np.pi / grid_size
+    p = np.exp(bw * (np.cos(z) - 1)) / (2 * np.pi * i0e(bw))
+
+    loo = np.fft.irfft(np.fft.rfft(counts) * np.fft.rfft(p), grid_size) - p[0]
+
+    bins = np.flatnonzero(counts)
+    log_loo = np.log(np.maximum(loo[bins], 1e-300))
+
+    # Values at the level of the FFT round-off, e.g. of isolated samples, are
+    # computed directly in log scale
+    low = np.flatnonzero(loo[bins] < 1e-12 * n_samples * p[0])
+    if low.shape[0]:
+        log_loo[low] = _logLooBinned(bw, counts, bins, low)
+
+    result = (counts[bins] * (log_loo - np.log(n_samples))).sum() / n_samples
+
+    # 1 / result because Scipy dosent have maximize func
+    result = 1 / result
+
+    return result
+
+
+def _logLooBinned(bw, counts, bins, low, max_memory=2**27):
+    """Log of the leave-one-out sum of the von Mises of some bins
+
+    Parameters
+    ----------
+    bw : the bandwidth for the Von Mises probability function
+
+    counts : array-like of shape = [grid_size] of bin counts
+
+    bins : array-like of shape = [n_bins] of the non empty bins
+
+    low : array-like of the positions in bins of the bins to compute
+
+    max_memory : int, memory budget in bytes of each block of bins
+
+    Returns
+    -------
+    log_loo : array-like of shape = [len(low)]
+
+    """
+    grid_size = counts.shape[0]
+    weights = counts[bins]
+    log_norm = np.log(2 * np.pi * i0e(bw))
+
+    block_size = max(1, max_memory // (8 * bins.shape[0]))
+    log_loo = np.empty(low.shape[0])
+    for start in range(0, low.shape[0], block_size):
+        block = low[start:start + block_size]
+        log_p = bw * (np.cos((bins[block, None] - bins) * 2 * np.pi / grid_size) - 1)
+        # Leave one out of the own bin
+        w = np.broadcast_to(weights, log_p.shape).copy()
+        w[np.arange(block.shape[0]), block] -= 1
+        log_loo[start:start + block_size] = logsumexp(log_p, b=w, axis=1) - log_norm
+
+    return log_loo
+
+
+def kernel2d(x1, x2, bw=(10, 10), n=(256, 256)):
+    """Estimate the bivariate von Mises product kernel on the torus
+
+    Joint version of kernel(method='fft') for two circular variables, e.g. the
+    hour and the day of week of the same dates. The samples are binned onto a
+    n[0] x n[1] grid and convolved with the product of two von Mises by 2-D FFT.
+
+    Parameters
+    ----------
+    x1, x2 : array-like of shape = [n_samples] of radians.
+
+    bw : tuple of the bandwidths of the kernel estimation of x1 and x2
+
+    n : tuple of the number of points of the kernel for x1 and x2
+
+    Returns
+    -------
+    y : array-like of shape = [n[0], n[1]]
+        Calculated von Mises kernel, where y[i, j] is the kernel at
+        np.linspace(0, 2 * pi, n[0])[i], np.linspace(0, 2 * pi, n[1])[j]
+
+    Examples
+    --------
+    >>> import pandas as pd
+    >>> from pycircular.circular import kernel2d, bwEstimation2d
+    >>> from pycircular.utils import _dates2rad
+    >>> dates = pd.to_datetime(["2013-10-02 19:10:00", "2013-10-21 19:00:00", "2013-10-24 3:00:00"])
+    >>> x1, x2 = _dates2rad(dates, time_segments=('hour', 'dayweek'))
+    >>> bw = bwEstimation2d(x1, x2)
+    >>> y = kernel2d(x1, x2, bw=bw, n=(96, 28))
+
+    """
+    x1 = np.asarray(x1, dtype=float)
+    n_samples = x1.shape[0]
+
+    # Closest point of the grid of each variable
+    idx = _grid_index(x1, n[0]) * n[1] + _grid_index(x2, n[1])
+    counts = np.bincount(idx, minlength=n[0] * n[1]).reshape(n)
+
+    p = np.outer(_von_mises_pdf(np.linspace(0, np.pi * 2, n[0]), bw[0]),
+                 _von_mises_pdf(np.linspace(0, np.pi * 2, n[1]), bw[1]))
+
+    y_kernel = np.fft.irfft2(np.fft.rfft2(counts) * np.fft.rfft2(p), s=n) / n_samples
+
+    # Standarized
+    y_kernel = y_kernel / y_kernel.max()
+
+    return y_kernel
+
+
+def predict_proba2d(x1, x2, y_kernel):
+    """Estimate the bivariate von Mises kernel probablities
+
+    Parameters
+    ----------
+    x1, x2 : array-like of shape = [n_samples] of radians.
+
+    y_kernel : array-like of shape = [n1, n2]
+        Calculated bivariate von Mises kernel, from kernel2d
+
+    Returns
+    -------
+    proba : array-like of shape = [n_samples]
+        Calculated von Mises kernel probabilites, NaN for NaN or infinite x1 or x2
+
+    """
+    y_kernel = np.asarray(y_kernel)
+    n1, n2 = y_kernel.shape
+    with np.errstate(invalid='ignore'):
+        x1 = np.mod(np.asarray(x1, dtype=float), np.pi * 2)
+        x2 = np.mod(np.asarray(x2, dtype=float), np.pi * 2)
+
+    return np.where(np.isfinite(x1) & np.isfinite(x2),
+                    y_kernel[_grid_index(x1, n1), _grid_index(x2, n2)], np.nan)
+
+
+def bwEstimation2d(x1, x2, lower=0.1, upper=500, grid_size=(256, 256)):
+    """Estimate the bandwidths of the bivariate von Mises product kernel
+
+    Likelihood cross validation as bwEstimation(method='cv_binned'): the samples are
+    binned onto a grid_size grid of the torus and the leave-one-out likelihood is
+    evaluated by 2-D FFT convolution of the bin counts. Both bandwidths are optimized
+    jointly in log scale, starting from the best point of a coarse grid.
+
+    Parameters
+    ----------
+    x1, x2 : array-like of shape = [n_samples] of radians.
+
+    lower, upper: range over which to minimize each bandwidth
+
+    grid_size : tuple of the number of bins of x1 and x2
+
+    Returns
+    -------
+    bw : tuple of the bandwidths of x1 and x2
+
+    """
+    if(len(x1)<2):
+        raise Exception("Need at least 2 data points")
+    x1 = np.asarray(x1, dtype=float)
+    x2 = np.asarray(x2, dtype=float)
+    from scipy.optimize import minimize
+
+    idx = [np.rint(x * m / (2 * np.pi)).astype(np.int64) % m for x, m in zip((x1, x2), grid_size)]
+    counts = np.bincount(idx[0] * grid_size[1] + idx[1],
+                         minlength=grid_size[0] * grid_size[1]).reshape(grid_size).astype(float)
+
+    def cost(log_bw):
+        return _costFunctionBinned2d(np.exp(log_bw), counts)
+
+    # The cost is not smooth for large bandwidths, so the search starts from the
+    # best point of a coarse grid
+    log_grid = np.linspace(np.log(lower), np.log(upper), 8)
+    start = min(((b1, b2) for b1 in log_grid for b2 in log_grid), key=cost)
+
+    bounds = [(np.log(lower), np.log(upper))] * 2
+    result = minimize(cost, start, method='Nelder-Mead', bounds=bounds,
+                      options={'xatol': 1e-3, 'fatol': 1e-8})
+    return tuple(np.exp(result.x))
+
+
+def _costFunctionBinned2d(bw, counts):
+    """Binned cross validation cost of the bivariate von Mises product kernel
+
+    Parameters
+    ----------
+    bw : tuple of the bandwidths of the two variables
+
+    counts : array-like of shape = [m1, m2] of bin counts
+
+    Returns
+    -------
+    result: cost of using bw in the log of the  Cross validatory Von Mises pdf, see _costFunctionBinned
+
+    """
+    n_samples = counts.sum()
+
+    p = [np.exp(b * (np.cos(np.arange(m) * 2 * np.pi / m) - 1)) / (2 * np.pi * i0e(b))
+         for b, m in zip(bw, counts.shape)]
+    p = np.outer(p[0], p[1])
+
+    loo = np.fft.irfft2(np.fft.rfft2(counts) * np.fft.rfft2(p), s=counts.shape) - p[0, 0]
+
+    rows, cols = np.nonzero(counts)
+    log_loo = np.log(np.maximum(loo[rows, cols], 1e-300))
+
+    # Values at the level of the FFT round-off are computed directly in log scale,
+    # isolated samples are frequent on the torus
+    low = np.flatnonzero(loo[rows, cols] < 1e-12 * n_samples * p[0, 0])
+    if low.shape[0]:
+        log_loo[low] = _logLooBinned2d(bw, counts, rows, cols, low)
+
+    result = (counts[rows, cols] * (log_loo - np.log(n_samples))).sum() / n_samples
+
+    # 1 / result because Scipy dosent have maximize func
+    result = 1 / result
+
+    return result
+
+
+def _logLooBinned2d(bw, counts, rows, cols, low, max_memory=2**27):
+    """Log of the leave-one-out sum of the bivariate von Mises of some bins
+
+    Parameters
+    ----------
+    bw : tuple of the bandwidths of the two variables
+
+    counts : array-like of shape = [m1, m2] of bin counts
+
+    rows, cols : array-like of shape = [n_bins] of the non empty bins
+
+    low : array-like of the positions in rows and cols of the bins to compute
+
+    max_memory : int, memory budget in bytes of each block of bins
+
+    Returns
+    -------
+    log_loo : array-like of shape = [len(low)]
+
+    """
+    m1, m2 = counts.shape
+    weights = counts[rows, cols].astype(float)
+    log_norm = np.log(2 * np.pi * i0e(bw[0])) + np.log(2 * np.pi * i0e(bw[1]))
+
+    block_size = max(1, max_memory // (8 * rows.shape[0]))
+    log_loo = np.empty(low.shape[0])
+    for start in range(0, low.shape[0], block_size):
+        block = low[start:start + block_size]
+        log_p = (bw[0] * (np.cos((rows[block, None] - rows) * 2 * np.pi / m1) - 1) +
+                 bw[1] * (np.cos((cols[block, None] - cols) * 2 * np.pi / m2) - 1))
+        # Leave one out of the own bin
+        w = np.broadcast_to(weights, log_p.shape).copy()
+        w[np.arange(block.shape[0]), block] -= 1
+        log_loo[start:start + block_size] = logsumexp(log_p, b=w, axis=1) - log_norm
+
+    return log_loo
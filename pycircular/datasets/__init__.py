@@ -4,6 +4,7 @@ including methods to load and fetch popular reference datasets. It also
 features some artificial data generators.
 """
 
-from .base import load_transactions
+from .base import load_transactions, load_transactions_file
+from .samples_generator import make_transactions
 
-__all__ = ['load_transactions']
\ No newline at end of file
+__all__ = ['load_transactions', 'load_transactions_file', 'make_transactions']
\ No newline at end of file
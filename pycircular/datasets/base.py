@@ -9,8 +9,11 @@ https://github.com/scikit-learn/scikit-learn/blob/56057c9630dd13f3c61fbb4c7debdf
 #               2014, 2023 Alejandro CORREA BAHNSEN <al.bahnsen@gmail.com>
 # License: BSD 3 clause
 
+import os
+import json
 from os.path import dirname
 from os.path import join
+from os.path import basename
 import numpy as np
 import pandas as pd
 
@@ -23,10 +26,17 @@ class Bunch(dict):
         self.__dict__ = self
 
 
-def load_transactions():
+def load_transactions(cache=False):
     """Load and return the transactions' dataset (classification).
 
     The bank transactions is an easily transformable transactional dataset.
+    The dates are parsed to datetime64[ns] and the integer columns, e.g. the
+    accounts in 'user', are stored in the smallest integer dtype.
+
+    Parameters
+    ----------
+    cache : bool, whether to use a columnar cache of the data written in the package,
+        see pycircular.datasets.load_transactions_file. The data is always loaded in memory
 
     Returns
     -------
@@ -48,10 +58,177 @@ def load_transactions():
     >>> data.data.head()
     """
     module_path = dirname(__file__)
-    raw_data = pd.read_csv(join(module_path, 'data', 'transactions.csv.gz'),
-                           delimiter=',', compression='gzip', index_col=0)
+    raw_data = load_transactions_file(join(module_path, 'data', 'transactions.csv.gz'),
+                                      index_col=0, cache=cache, mmap_mode=None).data
     # TODO: descr = open(join(module_path, 'descr', 'transactions.rst')).read()
     descr = ''
 
     return Bunch(data=raw_data, DESCR=descr,
                  feature_names=raw_data.columns.values, name='Transactions')
+
+
+def load_transactions_file(path, columns=None, date_columns=('date', ), index_col=None,
+                           chunksize=1000000, cache=False, mmap_mode='r'):
+    """Load a transactions file, e.g. a large extract with the schema of load_transactions
+
+    The file is read with pandas.read_csv in chunks, only the requested columns,
+    the date columns are parsed to datetime64[ns] and the integer columns are
+    stored in the smallest integer dtype.
+
+    If cache, a columnar copy of all the columns (one .npy file per column) is
+    written on the first load to the directory path + '.cache' next to the file,
+    and every load, the first one included, reads the requested columns from it,
+    as memory maps if mmap_mode. The cache is rewritten when the file changes, and
+    skipped silently if it cannot be written, e.g. on a read only file system, in
+    which case the data is loaded in memory. String columns are cached as fixed width
+    strings, and loaded in memory as object columns with NaN if they have missing values.
+
+    Parameters
+    ----------
+    path : str, path of the csv file, possibly compressed as inferred by pandas
+
+    columns : list of the columns to load, optional. By default all the columns
+
+    date_columns : list of the columns to parse as dates
+
+    index_col : int or str, column to use as index, optional
+
+    chunksize : int, number of rows parsed at once
+
+    cache : bool, whether to use the columnar cache
+
+    mmap_mode : mmap_mode of np.load for the cached columns, None to load them in
+        memory. With 'r' the columns of the DataFrame are read only. Only used if cache
+
+    Returns
+    -------
+    data : Bunch
+        Dictionary-like object, the interesting attributes are:
+        'data', the DataFrame of transactions, 'feature_names' and 'name'
+
+    Examples
+    --------
+    >>> from os.path import dirname, join
+    >>> import pycircular
+    >>> from pycircular.datasets import load_transactions_file
+    >>> path = join(dirname(pycircular.__file__), 'datasets', 'data', 'transactions.csv.gz')
+    >>> data = load_transactions_file(path, columns=['user', 'date'], index_col=0)
+    >>> data.data.dtypes
+    """
+    cache_path = path + '.cache'
+    arrays = index = None
+    if cache:
+        stat = os.stat(path)
+        source = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'index_col': index_col,
+                  'date_columns': list(date_columns)}
+
+        meta = _read_cache_meta(cache_path, source)
+        if meta is None:
+            arrays, index, meta = _read_columns(path, date_columns, index_col, chunksize)
+            meta['source'] = source
+            if _write_cache(cache_path, arrays, index, meta):
+                # Read back, so that every load returns the same arrays
+                arrays = index = None
+    else:
+        arrays, index, meta = _read_columns(path, date_columns, index_col, chunksize, columns)
+
+    if arrays is None:
+        # Columns and index from the cache
+        arrays = {col: _load_cached_column(cache_path, i, meta, mmap_mode)
+                  for i, col in enumerate(meta['columns']) if columns is None or col in columns}
+        index = np.load(join(cache_path, 'index.npy'), mmap_mode=mmap_mode) if meta['has_index'] else None
+
+    if columns is None:
+        columns = meta['columns']
+
+    data = pd.DataFrame({col: arrays[col] for col in columns}, index=index, copy=False)
+    if index is not None:
+        data.index.name = meta['index_name']
+
+    return Bunch(data=data, feature_names=data.columns.values, name=basename(path))
+
+
+def _read_columns(path, date_columns, index_col, chunksize, columns=None):
+    """Parse the columns of a csv file in chunks into one array per column"""
+    usecols = None
+    if columns is not None:
+        # Columns by name, as the positions of index_col are relative to usecols
+        if isinstance(index_col, int):
+            index_col = pd.read_csv(path, delimiter=',', nrows=0).columns[index_col]
+        usecols = list(columns) + ([index_col] if index_col is not None else [])
+
+    chunks = {}
+    index = []
+    for chunk in pd.read_csv(path, delimiter=',', index_col=index_col, usecols=usecols, chunksize=chunksize):
+        for col in chunk.columns:
+            if col in date_columns:
+                values = pd.to_datetime(chunk[col]).values.astype('datetime64[ns]')
+            elif pd.api.types.is_integer_dtype(chunk[col]):
+                values = pd.to_numeric(chunk[col], downcast='integer').values
+            else:
+                values = chunk[col].values
+            chunks.setdefault(col, []).append(values)
+        index.append(chunk.index.values)
+
+    arrays = {col: np.concatenate(values) for col, values in chunks.items()}
+    meta = {'columns': list(chunks), 'has_index': index_col is not None,
+            'index_name': chunk.index.name if index_col is not None else None}
+    index = np.concatenate(index) if index_col is not None else None
+
+    return arrays, index, meta
+
+
+def _read_cache_meta(cache_path, source):
+    """Metadata of the cache, None if there is no valid cache of source"""
+    try:
+        with open(join(cache_path, 'meta.json')) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # Caches without null_columns stored the missing strings as 'nan'
+    if meta.get('source') != source or 'null_columns' not in meta:
+        return None
+    return meta
+
+
+def _load_cached_column(cache_path, i, meta, mmap_mode):
+    """Column i of the cache, with its missing values as NaN like pandas.read_csv"""
+    values = np.load(join(cache_path, '%d.npy' % i), mmap_mode=mmap_mode)
+    if i in meta.get('null_columns', []):
+        values = values.astype(object)
+        values[np.load(join(cache_path, '%d.nulls.npy' % i))] = np.nan
+    return values
+
+
+def _write_cache(cache_path, arrays, index, meta):
+    """Write one .npy file per column, meta.json last so that a partial cache is not used
+
+    Returns
+    -------
+    written : bool, False if the cache could not be written
+
+    """
+    try:
+        os.makedirs(cache_path, exist_ok=True)
+        meta_path = join(cache_path, 'meta.json')
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        meta['null_columns'] = []
+        for i, col in enumerate(meta['columns']):
+            values = arrays[col]
+            if values.dtype == object:
+                # Fixed width strings can be memory mapped, with a mask of the missing values
+                nulls = pd.isna(values)
+                if nulls.any():
+                    np.save(join(cache_path, '%d.nulls.npy' % i), nulls)
+                    meta['null_columns'].append(i)
+                values = values.astype(str)
+            np.save(join(cache_path, '%d.npy' % i), values)
+        if index is not None:
+            np.save(join(cache_path, 'index.npy'), index)
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f)
+    except OSError:
+        # e.g. read only file system, the data is returned without cache
+        return False
+    return True
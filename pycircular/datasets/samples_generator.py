@@ -0,0 +1,142 @@
+"""
+Generate samples of synthetic data sets.
+"""
+
+# License: BSD 3 clause
+
+import numpy as np
+import pandas as pd
+
+
+def make_transactions(n_accounts=1000, mean_transactions=50, tail=1.5, min_transactions=2,
+                      max_transactions=100000, n_components=3, kappa=(1., 50.), start='2020-01-01', days=365,
+                      chunk_size=100000, random_state=None, path=None):
+    """Generate transactions with periodic time patterns per account
+
+    Synthetic version of pycircular.datasets.load_transactions, with the same
+    user, type, amt, date schema, for benchmarking at scale. Each account has:
+
+    - a heavy tailed number of transactions, min_transactions + a Lomax (Pareto II)
+      sample of shape tail with mean mean_transactions, truncated at max_transactions,
+    - a time of day drawn from a mixture of 1 to n_components von Mises
+      distributions, with uniform means, log-uniform concentrations in kappa
+      and Dirichlet weights,
+    - a day of week drawn from one von Mises distribution over the week,
+    - a probability of type 2 transactions and a log-normal amount scale.
+
+    The accounts are generated in vectorized chunks of chunk_size accounts, each
+    with its own random generator spawned from random_state, so the result only
+    depends on random_state and chunk_size, and each chunk can be written to disk
+    before the next one is generated.
+
+    Parameters
+    ----------
+    n_accounts : int, number of accounts
+
+    mean_transactions : float, mean number of transactions per account, > min_transactions
+
+    tail : float, shape of the Lomax distribution of the number of transactions, > 1.
+        The smaller the heavier the tail
+
+    min_transactions : int, minimum number of transactions per account, by default 2
+        as the bandwidth estimation of pycircular.training needs 2 transactions
+
+    max_transactions : int, maximum number of transactions per account
+
+    n_components : int, maximum number of von Mises components of the time of day
+
+    kappa : tuple of the range of the concentrations of the components
+
+    start : str, first day of the transactions
+
+    days : int, number of days of the transactions
+
+    chunk_size : int, number of accounts generated at once
+
+    random_state : None, int or np.random.SeedSequence
+
+    path : str, optional. If given the chunks are appended to this csv file,
+        compressed if the extension is e.g. '.gz', and path is returned
+
+    Returns
+    -------
+    data : pd.DataFrame of columns user, type, amt, date, sorted by user and date,
+        or path if given
+
+    Examples
+    --------
+    >>> from pycircular.datasets import make_transactions, load_transactions_file
+    >>> data = make_transactions(n_accounts=100, random_state=0)
+    >>> path = make_transactions(n_accounts=10000, random_state=0, path='/tmp/transactions.csv.gz')
+    >>> data = load_transactions_file(path).data
+
+    """
+    if mean_transactions <= min_transactions or tail <= 1:
+        raise ValueError("mean_transactions must be larger than min_transactions and tail larger than 1")
+
+    seed = random_state if isinstance(random_state, np.random.SeedSequence) else np.random.SeedSequence(random_state)
+    n_chunks = -(-n_accounts // chunk_size)
+    start = np.datetime64(start, 's')
+
+    chunks = []
+    for i, chunk_seed in enumerate(seed.spawn(n_chunks)):
+        first = i * chunk_size
+        chunk = _make_transactions_chunk(np.random.default_rng(chunk_seed), first + 1,
+                                         min(chunk_size, n_accounts - first), mean_transactions,
+                                         tail, min_transactions, max_transactions, n_components,
+                                         kappa, start, days)
+        if path is None:
+            chunks.append(chunk)
+        else:
+            chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False,
+                         date_format='%Y-%m-%d %H:%M:%S')
+
+    if path is not None:
+        return path
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _make_transactions_chunk(rng, first_user, n_accounts, mean_transactions, tail, min_transactions,
+                             max_transactions, n_components, kappa, start, days):
+    """Transactions of the accounts first_user to first_user + n_accounts - 1"""
+    # Heavy tailed counts, the mean of a Lomax of shape tail is 1 / (tail - 1)
+    counts = np.floor(rng.pareto(tail, n_accounts) * (mean_transactions - min_transactions) * (tail - 1))
+    counts = np.minimum(min_transactions + counts, max_transactions).astype(np.int64)
+    account = np.repeat(np.arange(n_accounts), counts)
+    n_trx = account.shape[0]
+
+    # Time of day, mixture of von Mises with 1 to n_components components
+    active = np.arange(n_components) < rng.integers(1, n_components + 1, (n_accounts, 1))
+    weights = rng.dirichlet(np.ones(n_components), n_accounts) * active
+    cum_weights = np.cumsum(weights / weights.sum(axis=1, keepdims=True), axis=1)
+    means = rng.uniform(-np.pi, np.pi, (n_accounts, n_components))
+    kappas = np.exp(rng.uniform(np.log(kappa[0]), np.log(kappa[1]), (n_accounts, n_components)))
+
+    component = (rng.random((n_trx, 1)) > cum_weights[account]).sum(axis=1)
+    component = np.minimum(component, n_components - 1)
+    angle = rng.vonmises(means[account, component], kappas[account, component])
+    seconds = np.floor(np.mod(angle, 2 * np.pi) * 86400 / (2 * np.pi)).astype(np.int64)
+
+    # Day of week, Monday=0, and the week within the days
+    dow_mean = rng.uniform(-np.pi, np.pi, n_accounts)
+    dow_kappa = np.exp(rng.uniform(np.log(kappa[0]), np.log(kappa[1]), n_accounts)) / 10
+    dow = np.floor(np.mod(rng.vonmises(dow_mean[account], dow_kappa[account]), 2 * np.pi) * 7 / (2 * np.pi))
+    # 1970-01-01 is a Thursday
+    start_day = start.astype('datetime64[D]').astype(np.int64)
+    offset = (dow.astype(np.int64) - (start_day + 3)) % 7
+    day = offset + 7 * rng.integers(0, -(-days // 7), n_trx)
+    day = np.where(day >= days, day - 7, day)
+    day = np.where(day < 0, offset, day)
+
+    date = start + (day * 86400 + seconds).astype('timedelta64[s]')
+
+    # Type and standarized-like amounts
+    p_type = rng.beta(2, 3, n_accounts)
+    trx_type = 1 + (rng.random(n_trx) < p_type[account]).astype(np.int8)
+    scale = rng.normal(0, 0.5, n_accounts)
+    amt = np.round(rng.lognormal(scale[account], 0.75) - 1, 3)
+
+    data = pd.DataFrame({'user': first_user + account, 'type': trx_type, 'amt': amt,
+                         'date': date.astype('datetime64[ns]')})
+    order = np.lexsort((data['date'].values, account))
+    return data.iloc[order].reset_index(drop=True)
@@ -0,0 +1,254 @@
+"""
+Mixtures of von Mises distributions fitted by expectation maximization
+
+The EM is vectorized over groups, samples and components, so that many
+accounts padded into one array are fitted at once, and large accounts can be
+fitted on binned data using the bin counts as weights.
+"""
+import numpy as np
+from scipy.special import i0e, logsumexp
+
+from .stats import von_mises_mle
+from .circular import predict_proba as _predict_proba
+
+
+def von_mises_mixture_batch(X, weights=None, n_components=2, max_iter=100, tol=1e-6,
+                            max_kappa=500., random_state=None):
+    """Fit a mixture of von Mises distributions to each row of X
+
+    Parameters
+    ----------
+    X : array-like of shape = [n_groups, n_samples] of radians.
+        Groups with less samples are padded, e.g. with 0, and given 0 weight
+
+    weights : array-like of shape = [n_groups, n_samples], optional
+        weight of each sample, e.g. a boolean mask of the padding, or the
+        counts of binned data. If None all the samples have weight 1
+
+    n_components : int, number of von Mises distributions of the mixture
+
+    max_iter : int, maximum number of EM iterations
+
+    tol : float, the EM of a group stops when the change of its mean
+        log-likelihood is below tol
+
+    max_kappa : float, maximum concentration of the components
+
+    random_state : None, int or np.random.Generator, used to choose the initial means
+
+    Returns
+    -------
+    pi : array-like of shape = [n_groups, n_components] of the weights of the components
+
+    mean : array-like of shape = [n_groups, n_components] of the mean directions
+
+    kappa : array-like of shape = [n_groups, n_components] of the concentrations
+
+    Groups with a total weight of 0, e.g. padding rows, are not fitted and have
+    pi of 1 / n_components, mean 0 and kappa 0, i.e. the uniform distribution.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from pycircular.mixture import von_mises_mixture_batch
+    >>> X = np.array([[0.8, 1., 1.1, 1.15, 4., 4.2, 4.3, 4.4],
+    >>>               [0.5, 0.6, 3.1, 3.2, 3.3, 0., 0., 0.]])
+    >>> mask = X > 0
+    >>> pi, mean, kappa = von_mises_mixture_batch(X, mask, n_components=2, random_state=0)
+
+    """
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+    if weights is None:
+        weights = np.ones_like(X)
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    n_groups = X.shape[0]
+    rng = np.random.default_rng(random_state)
+
+    sin_, cos_ = np.sin(X)[:, :, None], np.cos(X)[:, :, None]
+    total = weights.sum(axis=1, keepdims=True)
+
+    mean = _init_means(X, weights, n_components, rng)
+    kappa = np.ones((n_groups, n_components))
+    pi = np.full((n_groups, n_components), 1. / n_components)
+
+    # Groups without samples are uniform
+    active = total[:, 0] > 0
+    mean[~active] = 0
+    kappa[~active] = 0
+
+    loglik = np.full(n_groups, -np.inf)
+    for _ in range(max_iter):
+        # E-step
+        log_p = _log_pdf(X[active, :, None], pi[active, None], mean[active, None], kappa[active, None])
+        log_norm = logsumexp(log_p, axis=2, keepdims=True)
+        resp = np.exp(log_p - log_norm) * weights[active, :, None]
+
+        # M-step
+        Nk = resp.sum(axis=1)
+        mean_, kappa_ = von_mises_mle(Nk, (resp * sin_[active]).sum(axis=1), (resp * cos_[active]).sum(axis=1))
+        # Components without samples keep their parameters
+        empty = Nk <= 1e-10
+        mean[active] = np.where(empty, mean[active], mean_)
+        kappa[active] = np.where(empty, kappa[active], np.minimum(kappa_, max_kappa))
+        pi[active] = Nk / total[active]
+
+        # Convergence
+        loglik_ = (log_norm[:, :, 0] * weights[active]).sum(axis=1) / total[active, 0]
+        converged = np.fabs(loglik_ - loglik[active]) < tol
+        loglik[active] = loglik_
+        active[np.flatnonzero(active)[converged]] = False
+        if not active.any():
+            break
+
+    return pi, np.mod(mean, 2 * np.pi), kappa
+
+
+def _init_means(X, weights, n_components, rng):
+    """Initial means at samples of each group, chosen as in k-means++
+
+    The first mean is a sample chosen by weight, and the following ones are chosen
+    with probability proportional to the weight times the circular distance
+    1 - cos to the closest mean already chosen.
+    """
+    n_groups = X.shape[0]
+    mean = np.zeros((n_groups, n_components))
+    distance = np.ones_like(X)
+    for k in range(n_components):
+        p = weights * distance
+        cum = p.cumsum(axis=1)
+        # Groups where all the samples are equal to the chosen means
+        cum = np.where(cum[:, -1:] > 0, cum, weights.cumsum(axis=1))
+        u = rng.random((n_groups, 1)) * cum[:, -1:]
+        idx = np.minimum((cum <= u).sum(axis=1, keepdims=True), X.shape[1] - 1)
+        mean[:, k] = np.take_along_axis(X, idx, axis=1)[:, 0]
+        distance = np.minimum(distance, 1 - np.cos(X - mean[:, k:k + 1]))
+    return mean
+
+
+def _log_pdf(x, pi, mean, kappa):
+    """Log of the weighted von Mises pdf of each component"""
+    return np.log(pi) + kappa * (np.cos(x - mean) - 1) - np.log(2 * np.pi * i0e(kappa))
+
+
+class VonMisesMixture(object):
+    """Mixture of von Mises distributions
+
+    Cheaper alternative to the kernel of pycircular.circular.kernel for accounts
+    with few modes, e.g. morning and evening activity.
+
+    Parameters
+    ----------
+    n_components : int, number of von Mises distributions of the mixture
+
+    max_iter : int, maximum number of EM iterations
+
+    tol : float, the EM stops when the change of the mean log-likelihood is below tol
+
+    max_kappa : float, maximum concentration of the components
+
+    n_bins : int, optional. If given and there are more samples than n_bins, the
+        samples are binned onto n_bins points of the circle and the EM uses the counts
+
+    random_state : None, int or np.random.Generator, used to choose the initial means
+
+    Attributes
+    ----------
+    pi_ : array-like of shape = [n_components] of the weights of the components
+
+    mean_ : array-like of shape = [n_components] of the mean directions
+
+    kappa_ : array-like of shape = [n_components] of the concentrations
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from pycircular.mixture import VonMisesMixture
+    >>> x = np.array([0.8 ,  1.  ,  1.1 ,  1.15,  4.  ,  4.2 ,  4.3 ,  4.4])
+    >>> mixture = VonMisesMixture(n_components=2, random_state=0).fit(x)
+    >>> y = mixture.kernel(n=256)
+    >>> proba = mixture.predict_proba(np.array([1., 3.]))
+
+    """
+
+    def __init__(self, n_components=2, max_iter=100, tol=1e-6, max_kappa=500., n_bins=None,
+                 random_state=None):
+        self.n_components = n_components
+        self.max_iter = max_iter
+        self.tol = tol
+        self.max_kappa = max_kappa
+        self.n_bins = n_bins
+        self.random_state = random_state
+
+    def fit(self, x):
+        """Fit the mixture
+
+        Parameters
+        ----------
+        x : array-like of shape = [n_samples] of radians.
+
+        Returns
+        -------
+        self
+
+        """
+        x = np.asarray(x, dtype=float)
+        weights = None
+        if self.n_bins is not None and x.shape[0] > self.n_bins:
+            idx = np.rint(x * self.n_bins / (2 * np.pi)).astype(np.int64) % self.n_bins
+            weights = np.bincount(idx, minlength=self.n_bins)
+            x = np.arange(self.n_bins) * 2 * np.pi / self.n_bins
+
+        pi, mean, kappa = von_mises_mixture_batch(x[None], None if weights is None else weights[None],
+                                                  n_components=self.n_components, max_iter=self.max_iter,
+                                                  tol=self.tol, max_kappa=self.max_kappa,
+                                                  random_state=self.random_state)
+        self.pi_, self.mean_, self.kappa_ = pi[0], mean[0], kappa[0]
+        return self
+
+    def pdf(self, x):
+        """Density of the mixture
+
+        Parameters
+        ----------
+        x : array-like of shape = [n_samples] of radians.
+
+        Returns
+        -------
+        p : array-like of shape = [n_samples]
+
+        """
+        x = np.asarray(x, dtype=float)
+        return np.exp(logsumexp(_log_pdf(x[..., None], self.pi_, self.mean_, self.kappa_), axis=-1))
+
+    def kernel(self, n=256):
+        """Standarized density on the points of the circle, as pycircular.circular.kernel
+
+        Parameters
+        ----------
+        n : number of points of the kernel
+
+        Returns
+        -------
+        y : array-like of shape = [n]
+
+        """
+        y = self.pdf(np.linspace(0, np.pi * 2, n))
+        return y / y.max()
+
+    def predict_proba(self, x, n=256, interpolate=False):
+        """Kernel probabilities, as pycircular.circular.predict_proba with the kernel of the mixture
+
+        Parameters
+        ----------
+        x : array-like of shape = [n_samples] of radians.
+
+        n : number of points of the kernel
+
+        interpolate : bool, see pycircular.circular.predict_proba
+
+        Returns
+        -------
+        proba : array-like of shape = [n_samples]
+
+        """
+        return _predict_proba(x, self.kernel(n), interpolate=interpolate)
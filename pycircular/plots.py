@@ -1,47 +1,117 @@
 
+import os
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
 import numpy as np
 import pandas as pd
-import matplotlib as mpl
-import matplotlib.pyplot as plt
-import operator
-from matplotlib.ticker import FuncFormatter
-import seaborn as sns
-current_palette = sns.color_palette()
 import matplotlib.ticker as mticker
 
-import os
-import os.path as op
-import sys
-sys.path.append(op.dirname(op.dirname(op.dirname(op.abspath("__file__")))))
-
-from pycircular.utils import date2rad
-from pycircular.stats import periodic_mean_std, von_mises_distribution
-from pycircular.stats import kuiper_two
+from .utils import date2rad
+from .stats import periodic_mean_std, von_mises_distribution
+from .stats import kuiper_two
 
 fig_adjustment = {'hour': 2*np.pi/30, 'dayweek': -2*np.pi/8, 'daymonth': -2*np.pi/35}
 
 
+@lru_cache(maxsize=None)
+def _current_palette():
+    """Seaborn palette, seaborn and pyplot are only imported when plotting"""
+    import seaborn as sns
+    return sns.color_palette()
+
+
+def __getattr__(name):
+    # Kept for the module level current_palette of previous versions
+    if name == 'current_palette':
+        return _current_palette()
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
 def plot_kernel(dates, freq, y, bottom=0, ymax=1,
                 rescale=True, figsize=(8, 8),
-                time_segment='hour', fig=None, ax1=None):
+                time_segment='hour', fig=None, ax1=None, z=None):
     """Figure for plotting the kernel
     # TODO: finish
+
+    z : array-like of shape = [n] of the points of the kernel, optional.
+        Defaults to np.linspace(0, 2 * pi, n), computed once per n
     """
 
     fig, ax1 = base_periodic_fig(dates, freq, bottom=bottom, ymax=ymax,
                                  rescale=rescale, figsize=figsize,
                                  time_segment=time_segment, fig=fig, ax1=ax1)
+    _plot_kernel_line(ax1, y, z, rescale, time_segment)
+
+    return fig, ax1
+
+
+def plot_kernel_bins(freq, y, z=None, bottom=0, ymax=1,
+                     rescale=True, figsize=(8, 8),
+                     time_segment='hour', fig=None, ax1=None):
+    """Figure for plotting the kernel from pre-binned frequencies
+
+    Same figure as plot_kernel, where the cost depends on the number of bins and
+    points of the kernel and not on the number of transactions.
+
+    Parameters
+    ----------
+    freq : array-like of shape = [n_bins] of frequencies or counts, as returned by
+        pycircular.utils.freq_time_bins
+
+    y : array-like of shape = [n] of the kernel, e.g. from pycircular.circular.kernel
+
+    z : array-like of shape = [n] of the points of the kernel, optional.
+        Defaults to np.linspace(0, 2 * pi, n), computed once per n
+
+    time_segment: string of values ['hour', 'dayweek', 'daymonth']
+
+    Returns
+    -------
+    fig, ax : Figure and axis objects
+
+    Examples
+    --------
+    >>> import pandas as pd
+    >>> from pycircular.datasets import load_transactions
+    >>> from pycircular.utils import freq_time_bins, _dates2rad
+    >>> from pycircular.circular import kernel
+    >>> from pycircular.plots import plot_kernel_bins
+    >>> dates = pd.to_datetime(load_transactions().data['date'])
+    >>> freq = freq_time_bins(dates, time_segment='hour')
+    >>> y = kernel(_dates2rad(dates, time_segments=('hour', ))[0], bw=10, method='fft')
+    >>> fig, ax1 = plot_kernel_bins(freq, y, time_segment='hour')
+    """
+
+    fig, ax1 = base_periodic_fig_bins(freq, bottom=bottom, ymax=ymax,
+                                      rescale=rescale, figsize=figsize,
+                                      time_segment=time_segment, fig=fig, ax1=ax1)
+    _plot_kernel_line(ax1, y, z, rescale, time_segment)
+
+    return fig, ax1
+
+
+def _plot_kernel_line(ax1, y, z, rescale, time_segment):
+    """Plot the kernel line and its fill"""
+    y = np.asarray(y)
     if rescale:
         y = y / y.max()
 
-    n = y.shape[0]
-    z = np.linspace(0, np.pi * 2, n)
+    if z is None:
+        z = _kernel_grid(y.shape[0])
+    z = z + fig_adjustment[time_segment]
 
-    ax1.plot(z + fig_adjustment[time_segment], y, color=current_palette[1], ls='-', linewidth=2, label="Kernel - von Mises")
-    ax1.fill_between(z + fig_adjustment[time_segment], 0, y, alpha=0.5, color=current_palette[1])
+    ax1.plot(z, y, color=_current_palette()[1], ls='-', linewidth=2, label="Kernel - von Mises")
+    ax1.fill_between(z, 0, y, alpha=0.5, color=_current_palette()[1])
     ax1.legend(bbox_to_anchor=(-0.3, 0.05), loc="upper left", borderaxespad=0)
 
-    return fig, ax1
+
+@lru_cache(maxsize=8)
+def _kernel_grid(n):
+    """Points of a kernel of n points, read only as it is shared"""
+    z = np.linspace(0, np.pi * 2, n)
+    z.flags.writeable = False
+    return z
 
 
 def base_periodic_fig(dates, freq, bottom=0, ymax=1,
@@ -83,10 +153,71 @@ def base_periodic_fig(dates, freq, bottom=0, ymax=1,
     angles = date2rad(dates, time_segment)
 
     if fig is None:
+        import matplotlib.pyplot as plt
         fig = plt.figure(figsize=figsize)
         ax1 = plt.subplot(111, polar=True)
 
-    # Define figure parameters
+    width, shift = _clock_axes(ax1, time_segment)
+    angles = angles + shift
+
+    ax1.bar(angles, freq, width=width, bottom=bottom, alpha=0.5, label="Dates")
+    ax1.set_ylim([0, bottom+ymax])
+
+    ax1.set_yticklabels([])
+    return fig, ax1
+
+
+def base_periodic_fig_bins(freq, bottom=0, ymax=1,
+                           rescale=True, figsize=(8, 8),
+                           time_segment='hour', fig=None, ax1=None):
+    """Base figure for plotting periodic time variables from pre-binned frequencies
+
+    Same figure as base_periodic_fig, with one bar per time period instead of
+    the dates, so a large population can be aggregated once and plotted many times.
+
+    Parameters
+    ----------
+    freq : array-like of shape = [n_bins] of frequencies or counts, as returned by
+        pycircular.utils.freq_time_bins, n_bins being 24, 7 or 31 for
+        hours 0 to 23, days of week Monday=0 to Sunday=6, or days of month 1 to 31.
+
+    time_segment: string of values ['hour', 'dayweek', 'daymonth']
+
+    Returns
+    -------
+    fig, ax : Figure and axis objects
+
+    Examples
+    --------
+    >>> import pandas as pd
+    >>> from pycircular.utils import freq_time_bins
+    >>> from pycircular.plots import base_periodic_fig_bins
+    >>> dates = pd.to_datetime(["2013-10-02 19:10:00", "2013-10-21 19:00:00", "2013-10-24 3:00:00"])
+    >>> freq = freq_time_bins(dates, time_segment='dayweek')
+    >>> fig, ax1 = base_periodic_fig_bins(freq, time_segment='dayweek')
+    """
+
+    return base_periodic_fig(_bin_values(time_segment), np.asarray(freq, dtype=float), bottom=bottom,
+                             ymax=ymax, rescale=rescale, figsize=figsize,
+                             time_segment=time_segment, fig=fig, ax1=ax1)
+
+
+def _clock_axes(ax1, time_segment='hour'):
+    """Set the ticks of a polar axis as a clock of the time segment
+
+    Parameters
+    ----------
+    ax1 : polar axis
+
+    time_segment: string of values ['hour', 'dayweek', 'daymonth']
+
+    Returns
+    -------
+    width : width of the bars of the time periods
+
+    shift : shift of the angles of the bars for a better visualization
+
+    """
     width = (2*np.pi)
 
     if time_segment == 'hour':
@@ -94,7 +225,7 @@ def base_periodic_fig(dates, freq, bottom=0, ymax=1,
         ticks_loc = ax1.get_xticks().tolist()
         ax1.xaxis.set_major_locator(mticker.FixedLocator(ticks_loc))
         ax1.set_xticklabels(['6h', '3h', '0h', '21h', '18h', '15h', '12h', '9h'])
-        angles=[i+(width/2) for i in angles]
+        shift = width/2
 
     elif time_segment == 'dayweek':
         width /= 30
@@ -104,7 +235,7 @@ def base_periodic_fig(dates, freq, bottom=0, ymax=1,
         ticks_loc = ax1.get_xticks().tolist()
         ax1.xaxis.set_major_locator(mticker.FixedLocator(ticks_loc))
         ax1.set_xticklabels(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
-        angles=[i-(width) for i in angles]
+        shift = -width
         # TO DO: check the shift amount for good visualization
         # angles=[i-(width/2) for i in angles] ?
 
@@ -116,14 +247,14 @@ def base_periodic_fig(dates, freq, bottom=0, ymax=1,
         ticks_loc = ax1.get_xticks().tolist()
         ax1.xaxis.set_major_locator(mticker.FixedLocator(ticks_loc))
         ax1.set_xticklabels(range(1, 32))
-        angles=[i-(width/2) for i in angles]
+        shift = -width/2
         # TODO: what to do with 31
 
-    ax1.bar(angles, freq, width=width, bottom=bottom, alpha=0.5, label="Dates")
-    ax1.set_ylim([0, bottom+ymax])
+    else:
+        raise ValueError("time_segment must be one of ['hour', 'dayweek', 'daymonth']")
+
+    return width, shift
 
-    ax1.set_yticklabels([])
-    return fig, ax1
 
 # TODO: Inherit the properties from base_clock. Probably as a class
 def clock_vonmises_distribution(ax1, mean, x, p, rescale=True):
@@ -133,11 +264,11 @@ def clock_vonmises_distribution(ax1, mean, x, p, rescale=True):
         p = p / p.max()
 
     # Plot the mean
-    ax1.plot([mean, mean], [0, 1], c=current_palette[1], ls='--', linewidth=5)
+    ax1.plot([mean, mean], [0, 1], c=_current_palette()[1], ls='--', linewidth=5)
 
     # Plot the distribution
-    ax1.plot(x, p, c=current_palette[1], ls='-', linewidth=2, label="von Mises Distribution")
-    ax1.fill_between(x, 0, p, alpha=0.5, color=current_palette[1])
+    ax1.plot(x, p, c=_current_palette()[1], ls='-', linewidth=2, label="von Mises Distribution")
+    ax1.fill_between(x, 0, p, alpha=0.5, color=_current_palette()[1])
     ax1.legend(bbox_to_anchor=(-0.3, 0.05), loc="upper left", borderaxespad=0)
 
     return ax1
@@ -170,6 +301,7 @@ def plot_CDF_kernel(x, y):
 
     p, (z, d_cdf, k_cdf, D1_, D2_, D1, D2) = kuiper_two(x, y, return_all=True)
 
+    import matplotlib.pyplot as plt
     fig = plt.figure()
     ax1 = plt.subplot(111)
     ax1.plot(z, d_cdf)
@@ -181,3 +313,222 @@ def plot_CDF_kernel(x, y):
 
 
 
+
+
+def _bin_values(time_segment='hour'):
+    """Hours, days of week or days of month of the bins of pycircular.utils.freq_time_bins"""
+    if time_segment == 'hour':
+        return np.arange(24)
+    elif time_segment == 'dayweek':
+        return np.arange(7)
+    elif time_segment == 'daymonth':
+        return np.arange(1, 32)
+    raise ValueError("time_segment must be one of ['hour', 'dayweek', 'daymonth']")
+
+
+def _bin_angles(time_segment='hour'):
+    """Angles of the bins of pycircular.utils.freq_time_bins
+
+    Parameters
+    ----------
+    time_segment: string of values ['hour', 'dayweek', 'daymonth']
+
+    Returns
+    -------
+    angles : np.ndarray of shape = [n_bins] of radians, n_bins being 24, 7 or 31
+
+    """
+    return date2rad(_bin_values(time_segment), time_segment)
+
+
+class ClockRenderer(object):
+    """Headless renderer of clock figures of many accounts
+
+    The figure is drawn with the Agg backend without pyplot, and the bars, the
+    kernel line and its fill are created once and updated for each account, so
+    rendering thousands of accounts neither re-creates axes nor leaks figures.
+
+    Parameters
+    ----------
+    time_segment: string of values ['hour', 'dayweek', 'daymonth']
+
+    n : number of points of the kernels, 0 to only draw the frequencies
+
+    figsize : size of the figure in inches
+
+    dpi : resolution of the PNG files
+
+    bottom : bottom of the bars
+
+    Examples
+    --------
+    >>> import pandas as pd
+    >>> from pycircular.datasets import load_transactions
+    >>> from pycircular.utils import freq_time_bins
+    >>> from pycircular.plots import ClockRenderer
+    >>> data = load_transactions().data
+    >>> freq, keys = freq_time_bins(pd.to_datetime(data['date']), 'hour', groups=data['user'])
+    >>> renderer = ClockRenderer('hour', n=0)
+    >>> for f, key in zip(freq, keys):
+    >>>     renderer.render(f, path='/tmp/clock_%s.png' % key)
+
+    """
+
+    def __init__(self, time_segment='hour', n=256, figsize=(8, 8), dpi=100, bottom=0):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.time_segment = time_segment
+        self.n = n
+        self.bottom = bottom
+
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(self.fig)
+        self.ax1 = self.fig.add_subplot(111, polar=True)
+
+        width, shift = _clock_axes(self.ax1, time_segment)
+        angles = _bin_angles(time_segment) + shift
+        self.bars = self.ax1.bar(angles, np.zeros_like(angles), width=width, bottom=bottom,
+                                 alpha=0.5, label="Dates")
+
+        self.line = self.polygon = None
+        if n:
+            self.z = _kernel_grid(n) + fig_adjustment[time_segment]
+            self.line, = self.ax1.plot(self.z, np.zeros(n), color='C1', ls='-', linewidth=2,
+                                       label="Kernel - von Mises")
+            self.polygon, = self.ax1.fill(np.r_[self.z, self.z[[-1, 0]]], np.zeros(n + 2),
+                                          alpha=0.5, color='C1')
+            self.ax1.legend(bbox_to_anchor=(-0.3, 0.05), loc="upper left", borderaxespad=0)
+
+        self.ax1.set_ylim([0, bottom + 1])
+        self.ax1.set_yticklabels([])
+
+    def render(self, freq, y=None, path=None, title=None, format=None):
+        """Update the figure with the frequencies and kernel of one account
+
+        Parameters
+        ----------
+        freq : array-like of shape = [n_bins] of frequencies, as a row of pycircular.utils.freq_time_bins
+
+        y : array-like of shape = [n], the kernel, optional
+
+        path : str, file where the figure is saved, optional
+
+        title : str, title of the figure, optional
+
+        format : str, e.g. 'png' or 'svg'. If None it is taken from path
+
+        Returns
+        -------
+        fig : Figure object
+
+        """
+        freq = np.asarray(freq, dtype=float)
+        if freq.max() > 0:
+            freq = freq / freq.max()
+        for bar, height in zip(self.bars, freq):
+            bar.set_height(height)
+
+        if self.line is not None:
+            if y is None:
+                y = np.zeros(self.n)
+            y = np.asarray(y, dtype=float)
+            if y.max() > 0:
+                y = y / y.max()
+            self.line.set_ydata(y)
+            self.polygon.set_xy(np.c_[np.r_[self.z, self.z[[-1, 0]]], np.r_[y, 0, 0]])
+
+        self.fig.suptitle('' if title is None else title)
+
+        if path is not None:
+            self.fig.savefig(path, format=format)
+        return self.fig
+
+
+@lru_cache(maxsize=4)
+def _clock_renderer(time_segment, n, figsize, dpi):
+    """ClockRenderer of each worker, reused across chunks"""
+    return ClockRenderer(time_segment, n=n, figsize=figsize, dpi=dpi)
+
+
+def _render_clock_chunk(freq, kernels, paths, time_segment, n, figsize, dpi):
+    """Render the clock figures of a chunk of accounts"""
+    renderer = _clock_renderer(time_segment, n, figsize, dpi)
+    for i, path in enumerate(paths):
+        renderer.render(freq[i], None if kernels is None else kernels[i], path=path,
+                        title=os.path.splitext(os.path.basename(path))[0])
+    return len(paths)
+
+
+def render_clock_plots(freq, keys, directory, kernels=None, time_segment='hour',
+                       format='png', figsize=(8, 8), dpi=100, n_jobs=1, chunksize=256):
+    """Render the clock figure of each account to a file
+
+    Parameters
+    ----------
+    freq : array-like of shape = [n_groups, n_bins] of frequencies,
+        as returned by pycircular.utils.freq_time_bins with groups
+
+    keys : array-like of shape = [n_groups] of the accounts, used as file names
+
+    directory : str, directory where the files are written, created if needed
+
+    kernels : array-like of shape = [n_groups, n] of kernels, optional
+
+    time_segment: string of values ['hour', 'dayweek', 'daymonth']
+
+    format : str, 'png' or 'svg'
+
+    figsize : size of the figures in inches
+
+    dpi : resolution of the PNG files
+
+    n_jobs : int, number of processes, -1 uses all the CPUs. Each process reuses one
+        figure, and at most two chunks per process are pending at any time to bound memory
+
+    chunksize : int, number of accounts sent to a process at once
+
+    Returns
+    -------
+    paths : list of the written files
+
+    Examples
+    --------
+    >>> import pandas as pd
+    >>> from pycircular.datasets import load_transactions
+    >>> from pycircular.utils import freq_time_bins
+    >>> from pycircular.plots import render_clock_plots
+    >>> data = load_transactions().data
+    >>> freq, keys = freq_time_bins(pd.to_datetime(data['date']), 'hour', groups=data['user'])
+    >>> paths = render_clock_plots(freq, keys, '/tmp/clocks', n_jobs=2)
+
+    """
+    freq = np.asarray(freq, dtype=float)
+    n = 0 if kernels is None else np.shape(kernels)[1]
+    os.makedirs(directory, exist_ok=True)
+    paths = [os.path.join(directory, '%s.%s' % (key, format)) for key in keys]
+
+    chunks = ((freq[i:i + chunksize], None if kernels is None else np.asarray(kernels[i:i + chunksize]),
+               paths[i:i + chunksize], time_segment, n, tuple(figsize), dpi)
+              for i in range(0, len(paths), chunksize))
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
+
+    if n_jobs == 1:
+        for chunk in chunks:
+            _render_clock_chunk(*chunk)
+        return paths
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        pending = set()
+        for chunk in chunks:
+            if len(pending) >= 2 * n_jobs:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            pending.add(executor.submit(_render_clock_chunk, *chunk))
+        for future in pending:
+            future.result()
+
+    return paths
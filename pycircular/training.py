@@ -1,13 +1,17 @@
+import os
+import heapq
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 
 import pandas as pd
 import numpy as np
 
-from .circular import bwEstimation, kernel
-from .utils import _date2rad
+from .circular import bwEstimation, kernel, _grid_index
+from .utils import _dates2rad
 from .stats import kuiper_two
 
 
-def train_time_periodic(trx_train, n=256, idname='account'):
+def train_time_periodic(trx_train, n=256, idname='account', n_jobs=1, compact=False):
     """Evaluate the time periodic risk of different accounts
 
     Parameters
@@ -16,26 +20,611 @@ def train_time_periodic(trx_train, n=256, idname='account'):
 
     n : number of points of the kernel
 
+    idname : name of the column with the account ids
+
+    n_jobs : int, number of processes. -1 uses all the CPUs.
+        The accounts are split in n_jobs chunks balanced by their number of
+        transactions, and the sorted dates are shared with the workers through
+        a memory-mapped file.
+
+    compact : bool, whether to return a TimePeriodicRisks instead of a dictionary
+
     Returns
     -------
     risks_all : dictionary of shape n_accounts where each value is a
-        pd.DataFrame of shape = [3, n + 1] for each account
+        pd.DataFrame of shape = [3, n + 2] for each account
         where the rows are the different time segments ['hour', 'dayweek', 'daymonth']
-        the columns are the n points of the kernel and the confidence of the kernel
+        the columns are the n points of the kernel, the confidence of the kernel and the bw
+
+        If compact, a TimePeriodicRisks with the same information.
 
     """
 
-    # For each account
-    accounts = trx_train[f'{idname}'].unique()
+    accounts, dates, offsets = _group_dates(trx_train, idname)
+
+    risks = _train_risks(dates, offsets, n=n, n_jobs=n_jobs)
 
+    if compact:
+        return TimePeriodicRisks.from_arrays(accounts, risks, n=n)
+
+    # For each account
     risks_all = dict()
-    for account in accounts:
-        dates = trx_train.query(f'{idname} == {account}')['date']
-        risks_all[account] = _train_time_periodic_account(dates, n=256)
+    for account, risks_account in zip(accounts, risks):
+        risks_all[account] = _risks_frame(risks_account, n=n)
 
     return risks_all
 
 
+def score_time_periodic(trx, model, idname='account', unseen=np.nan):
+    """Score the time periodic risk of transactions against the trained accounts
+
+    Parameters
+    ----------
+    trx : pd.DataFrame of the transactions to score
+
+    model : TimePeriodicRisks, TimePeriodicModel or dictionary returned by train_time_periodic
+
+    idname : name of the column with the account ids
+
+    unseen : float, risk and confidence of the transactions of accounts that are not in model,
+        and of the transactions without date
+
+    Returns
+    -------
+    scores : pd.DataFrame of shape = [n_samples, 2 * n_segments] with the same index as trx
+        with the columns 'Risk_' + time_segment and 'Risk_confidence_' + time_segment
+        for each time segment of the model
+
+    Examples
+    --------
+    >>> import pandas as pd
+    >>> from pycircular.datasets import load_transactions
+    >>> from pycircular.training import train_time_periodic, score_time_periodic
+    >>> trx = load_transactions().data
+    >>> trx['date'] = pd.to_datetime(trx['date'])
+    >>> model = train_time_periodic(trx, idname='user', compact=True)
+    >>> scores = score_time_periodic(trx, model, idname='user')
+
+    """
+    if isinstance(model, TimePeriodicModel):
+        model = model.risks_
+    elif isinstance(model, dict):
+        model = TimePeriodicRisks.from_dict(model)
+
+    n = model.risks.shape[2]
+    n_segments = len(model.time_segments)
+
+    radians = _dates2rad(_local_dates(trx['date']), time_segments=model.time_segments)
+    idx = _grid_index(radians, n).T
+
+    rows = model.get_indexer(trx[idname])
+    # Transactions without date, NaN radians, are scored as unseen accounts
+    seen = (rows >= 0) & np.isfinite(radians).all(axis=0)
+    segments = np.arange(n_segments)
+
+    risk = np.full((rows.shape[0], n_segments), unseen, dtype=float)
+    confidence = np.full((rows.shape[0], n_segments), unseen, dtype=float)
+    risk[seen] = model.risks[rows[seen, None], segments, idx[seen]]
+    confidence[seen] = model.confidence[rows[seen]]
+
+    columns = (['Risk_' + time_segment for time_segment in model.time_segments] +
+               ['Risk_confidence_' + time_segment for time_segment in model.time_segments])
+    return pd.DataFrame(np.hstack([risk, confidence]), index=trx.index, columns=columns)
+
+
+class TimePeriodicModel(object):
+    """Time periodic risk model of a set of accounts, with incremental retraining
+
+    Parameters
+    ----------
+    n : number of points of the kernel
+
+    idname : name of the column with the account ids
+
+    n_jobs : int, number of processes used to train, see train_time_periodic
+
+    Attributes
+    ----------
+    risks_ : TimePeriodicRisks of the accounts
+
+    metadata_ : pd.DataFrame indexed by account with the number of transactions
+        'n_trx', the last date 'last_date' and the bandwidth of each time segment
+        'bw_hour', 'bw_dayweek', 'bw_daymonth' of the last fit of each account
+
+    Examples
+    --------
+    >>> import pandas as pd
+    >>> from pycircular.datasets import load_transactions
+    >>> from pycircular.training import TimePeriodicModel
+    >>> trx = load_transactions().data
+    >>> trx['date'] = pd.to_datetime(trx['date'])
+    >>> model = TimePeriodicModel(idname='user').fit(trx[trx['date'] < '2020-03-01'])
+    >>> model = model.update(trx)
+    >>> model = model.update(trx)  # No account changed, nothing is retrained
+
+    """
+
+    time_segments = ('hour', 'dayweek', 'daymonth')
+
+    def __init__(self, n=256, idname='account', n_jobs=1):
+        self.n = n
+        self.idname = idname
+        self.n_jobs = n_jobs
+
+    def fit(self, trx):
+        """Train all the accounts of trx
+
+        Parameters
+        ----------
+        trx : pd.DataFrame of the transactions
+
+        Returns
+        -------
+        self
+
+        """
+        self.risks_ = None
+        self.metadata_ = pd.DataFrame(columns=['n_trx', 'last_date'] +
+                                              ['bw_' + time_segment for time_segment in self.time_segments])
+        return self._fit_accounts(*_group_dates(trx, self.idname))
+
+    def update(self, trx):
+        """Retrain only the accounts with new activity
+
+        An account is retrained if it is new, or if its number of transactions or
+        last date in trx differ from the last fit. The previous bandwidths are used as
+        warm start of bwEstimation. Accounts that are not in trx keep their model.
+
+        Only the bandwidths and not the transactions of each account are kept, so
+        the accounts are retrained on the rows of trx, which must contain their full
+        history and not only the new transactions. A ValueError is raised if an
+        account has less transactions in trx than in the last fit.
+
+        Parameters
+        ----------
+        trx : pd.DataFrame of the transactions, with the full history of the
+            accounts with new activity
+
+        Returns
+        -------
+        self
+
+        """
+        accounts, dates, offsets = _group_dates(trx, self.idname)
+
+        n_trx = np.diff(offsets)
+        previous = self.metadata_.reindex(accounts)
+        touched = ((previous['n_trx'].to_numpy() != n_trx) |
+                   (previous['last_date'].to_numpy(dtype='datetime64[ns]') != _last_dates(dates, offsets)))
+
+        partial = previous['n_trx'].to_numpy(dtype=float) > n_trx
+        if partial.any():
+            raise ValueError("update needs the full history of the accounts, %d accounts have less "
+                             "transactions than in the last fit, e.g. %s" % (partial.sum(), accounts[partial][0]))
+
+        # Slices of the touched accounts
+        accounts, starts, stops = accounts[touched], offsets[:-1][touched], offsets[1:][touched]
+        dates = np.concatenate([dates[start:stop] for start, stop in zip(starts, stops)] + [dates[:0]])
+        offsets = np.zeros(accounts.shape[0] + 1, dtype=np.int64)
+        np.cumsum(stops - starts, out=offsets[1:])
+
+        warm_start = previous.loc[touched, ['bw_' + time_segment for time_segment in self.time_segments]]
+        return self._fit_accounts(accounts, dates, offsets, warm_start.to_numpy(dtype=float))
+
+    def _fit_accounts(self, accounts, dates, offsets, warm_start=None):
+        """Train the accounts and record their metadata"""
+        risks = _train_risks(dates, offsets, n=self.n, n_jobs=self.n_jobs,
+                             time_segments=self.time_segments, warm_start=warm_start)
+
+        metadata = pd.DataFrame({'n_trx': np.diff(offsets),
+                                 'last_date': _last_dates(dates, offsets)},
+                                index=accounts)
+        for j, time_segment in enumerate(self.time_segments):
+            metadata['bw_' + time_segment] = [risks_account[j, -1] for risks_account in risks]
+
+        risks = TimePeriodicRisks.from_arrays(accounts, risks, self.time_segments, n=self.n)
+        if self.risks_ is None:
+            self.risks_ = risks
+        else:
+            self.risks_.update(risks)
+
+        # Update the known accounts in place and append the new ones
+        known = metadata.index.isin(self.metadata_.index)
+        self.metadata_.loc[metadata.index[known]] = metadata[known]
+        self.metadata_ = pd.concat([self.metadata_, metadata[~known]]) if len(self.metadata_) else metadata
+
+        return self
+
+
+class TimePeriodicRisks(object):
+    """Compact container of the time periodic risks of a set of accounts
+
+    The risks of all the accounts are stored in one contiguous uint8 array, which
+    can be saved to a directory of .npy files and opened as memory maps, so that
+    scoring processes start instantly and share the pages.
+
+    Parameters
+    ----------
+    accounts : array-like of shape = [n_accounts] of account ids
+
+    risks : array-like of shape = [n_accounts, n_segments, n] of uint8
+        the risk of each point of the kernel, in [0, 100]
+
+    confidence : array-like of shape = [n_accounts, n_segments] of float32
+        the confidence of each kernel
+
+    bw : array-like of shape = [n_accounts, n_segments] of float32
+        the bandwidth of each kernel
+
+    time_segments : tuple of the time segments of the second axis
+
+    Examples
+    --------
+    >>> import pandas as pd
+    >>> from pycircular.datasets import load_transactions
+    >>> from pycircular.training import train_time_periodic, TimePeriodicRisks
+    >>> trx = load_transactions().data
+    >>> trx['date'] = pd.to_datetime(trx['date'])
+    >>> store = train_time_periodic(trx, idname='user', compact=True)
+    >>> store.save('risks')
+    >>> store = TimePeriodicRisks.load('risks')
+    >>> store[1]
+
+    """
+
+    def __init__(self, accounts, risks, confidence, bw,
+                 time_segments=('hour', 'dayweek', 'daymonth')):
+        self.accounts = accounts
+        self.risks = risks
+        self.confidence = confidence
+        self.bw = bw
+        self.time_segments = tuple(time_segments)
+        self._index = None
+
+    @classmethod
+    def from_arrays(cls, accounts, risks, time_segments=('hour', 'dayweek', 'daymonth'), n=0):
+        """Create from the arrays of shape = [n_segments, n + 2] of _time_periodic_risks
+
+        Parameters
+        ----------
+        accounts : array-like of shape = [n_accounts] of account ids
+
+        risks : list of shape n_accounts of arrays of shape = [n_segments, n + 2]
+
+        time_segments : tuple of the time segments
+
+        n : number of points of the kernel, only used if risks is empty
+
+        Returns
+        -------
+        store : TimePeriodicRisks
+
+        """
+        if len(risks):
+            risks = np.stack(risks)
+        else:
+            risks = np.zeros((0, len(time_segments), n + 2))
+        return cls(np.asarray(accounts), risks[:, :, :-2].astype(np.uint8),
+                   risks[:, :, -2].astype(np.float32), risks[:, :, -1].astype(np.float32),
+                   time_segments)
+
+    @classmethod
+    def from_dict(cls, risks_all):
+        """Create from the dictionary returned by train_time_periodic
+
+        Parameters
+        ----------
+        risks_all : dictionary of shape n_accounts of pd.DataFrame of shape = [n_segments, n + 2]
+
+        Returns
+        -------
+        store : TimePeriodicRisks
+
+        """
+        time_segments = tuple(next(iter(risks_all.values())).index) if risks_all else ()
+        return cls.from_arrays(list(risks_all.keys()), [risks.to_numpy() for risks in risks_all.values()],
+                               time_segments)
+
+    def to_dict(self):
+        """Dictionary of pd.DataFrame, as returned by train_time_periodic"""
+        return {account: self[account] for account in self.accounts}
+
+    def __len__(self):
+        return self.accounts.shape[0]
+
+    def __contains__(self, account):
+        return account in self.index
+
+    def __getitem__(self, account):
+        """pd.DataFrame of shape = [n_segments, n + 2] of an account"""
+        i = self.index.get_loc(account)
+        risks = np.column_stack([self.risks[i], self.confidence[i], self.bw[i]]).astype(float)
+        return _risks_frame(risks, n=self.risks.shape[2], time_segments=self.time_segments)
+
+    @property
+    def index(self):
+        """pd.Index of the account ids"""
+        if self._index is None:
+            self._index = pd.Index(self.accounts)
+        return self._index
+
+    def get_indexer(self, accounts):
+        """Rows of the accounts, -1 for unknown accounts
+
+        Parameters
+        ----------
+        accounts : array-like of account ids
+
+        Returns
+        -------
+        rows : array-like of int
+
+        """
+        return self.index.get_indexer(accounts)
+
+    def update(self, other):
+        """Replace the accounts of other and append the new ones
+
+        Parameters
+        ----------
+        other : TimePeriodicRisks with the same time segments and n
+
+        Returns
+        -------
+        self
+
+        """
+        rows = self.get_indexer(other.accounts)
+        known = rows >= 0
+        arrays = ('risks', 'confidence', 'bw')
+        if known.any():
+            # The arrays may be read only memory maps
+            for name in arrays:
+                array = np.array(getattr(self, name))
+                array[rows[known]] = getattr(other, name)[known]
+                setattr(self, name, array)
+
+        self.accounts = np.concatenate([self.accounts, other.accounts[~known]])
+        for name in arrays:
+            setattr(self, name, np.concatenate([getattr(self, name), getattr(other, name)[~known]]))
+        self._index = None
+
+        return self
+
+    def save(self, path):
+        """Save to a directory of .npy files
+
+        Parameters
+        ----------
+        path : path of the directory, created if it does not exist
+
+        """
+        os.makedirs(path, exist_ok=True)
+        accounts = self.accounts
+        if accounts.dtype == object:
+            accounts = accounts.astype(str)
+        np.save(os.path.join(path, 'accounts.npy'), accounts)
+        np.save(os.path.join(path, 'time_segments.npy'), np.array(self.time_segments, dtype=str))
+        for name in ('risks', 'confidence', 'bw'):
+            np.save(os.path.join(path, name + '.npy'), getattr(self, name))
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """Load a directory saved with save
+
+        Parameters
+        ----------
+        path : path of the directory
+
+        mmap_mode : None or string of values ['r', 'r+', 'c'], see np.load.
+            By default the arrays are opened as read only memory maps.
+
+        Returns
+        -------
+        store : TimePeriodicRisks
+
+        """
+        arrays = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode=mmap_mode)
+                  for name in ('risks', 'confidence', 'bw')}
+        accounts = np.load(os.path.join(path, 'accounts.npy'))
+        time_segments = tuple(np.load(os.path.join(path, 'time_segments.npy')).tolist())
+        return cls(accounts, time_segments=time_segments, **arrays)
+
+
+def _train_risks(dates, offsets, n=256, n_jobs=1,
+                 time_segments=('hour', 'dayweek', 'daymonth'), warm_start=None):
+    """Evaluate the time periodic risk of the accounts
+
+    Parameters
+    ----------
+    dates : array-like of shape = [n_samples] of 'datetime64[ns]' sorted by account
+
+    offsets : array-like of shape = [n_accounts + 1] of the account slices in dates
+
+    n : number of points of the kernel
+
+    n_jobs : int, number of processes. -1 uses all the CPUs.
+
+    time_segments : tuple of time segments
+
+    warm_start : array-like of shape = [n_accounts, len(time_segments)], optional
+        bandwidths used as warm start of bwEstimation, NaN for none
+
+    Returns
+    -------
+    risks : list of shape n_accounts of arrays of shape = [len(time_segments), n + 2], in account order
+
+    """
+    n_accounts = offsets.shape[0] - 1
+    if warm_start is None:
+        warm_start = np.full((n_accounts, len(time_segments)), np.nan)
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
+
+    if n_jobs > 1 and n_accounts > 1:
+        return _train_time_periodic_parallel(dates, offsets, n=n, n_jobs=n_jobs,
+                                             time_segments=time_segments, warm_start=warm_start)
+
+    return [_time_periodic_risks(dates[offsets[i]:offsets[i + 1]], n=n,
+                                 time_segments=time_segments, warm_start=warm_start[i])
+            for i in range(n_accounts)]
+
+
+def _train_time_periodic_parallel(dates, offsets, n=256, n_jobs=2,
+                                  time_segments=('hour', 'dayweek', 'daymonth'), warm_start=None):
+    """Evaluate the time periodic risk of the accounts in a process pool
+
+    Parameters
+    ----------
+    dates : array-like of shape = [n_samples] of 'datetime64[ns]' sorted by account
+
+    offsets : array-like of shape = [n_accounts + 1] of the account slices in dates
+
+    n : number of points of the kernel
+
+    n_jobs : int, number of processes
+
+    time_segments : tuple of time segments
+
+    warm_start : array-like of shape = [n_accounts, len(time_segments)] of warm start bandwidths
+
+    Returns
+    -------
+    risks : list of shape n_accounts of arrays of shape = [len(time_segments), n + 2], in account order
+
+    """
+    chunks = _balance_chunks(np.diff(offsets), n_jobs)
+
+    risks = [None] * (offsets.shape[0] - 1)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'dates.npy')
+        np.save(path, dates.view(np.int64))
+
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [executor.submit(_train_time_periodic_chunk, path,
+                                       [(i, offsets[i], offsets[i + 1]) for i in chunk], n,
+                                       time_segments, warm_start[chunk])
+                       for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                for i, risks_account in zip(chunk, future.result()):
+                    risks[i] = risks_account
+
+    return risks
+
+
+def _train_time_periodic_chunk(path, slices, n=256,
+                               time_segments=('hour', 'dayweek', 'daymonth'), warm_start=None):
+    """Worker of _train_time_periodic_parallel
+
+    Parameters
+    ----------
+    path : path of the .npy file with the int64 sorted dates
+
+    slices : list of (account index, start, stop)
+
+    n : number of points of the kernel
+
+    time_segments : tuple of time segments
+
+    warm_start : array-like of shape = [len(slices), len(time_segments)] of warm start bandwidths
+
+    Returns
+    -------
+    risks : list of arrays of shape = [len(time_segments), n + 2], in the order of slices
+
+    """
+    dates = np.load(path, mmap_mode='r')
+    return [_time_periodic_risks(np.asarray(dates[start:stop]).view('datetime64[ns]'), n=n,
+                                 time_segments=time_segments, warm_start=warm_start[j])
+            for j, (_, start, stop) in enumerate(slices)]
+
+
+def _balance_chunks(counts, n_chunks):
+    """Split the accounts in chunks of similar cost
+
+    The cost of the bandwidth search of an account grows with the square of
+    its number of transactions, so the accounts are assigned from the most to
+    the least expensive to the chunk with the lowest total cost.
+
+    Parameters
+    ----------
+    counts : array-like of shape = [n_accounts] of number of transactions
+
+    n_chunks : int, number of chunks
+
+    Returns
+    -------
+    chunks : list of arrays of account indexes, sorted within each chunk
+
+    """
+    cost = counts.astype(float) ** 2
+    heap = [(0., j) for j in range(min(n_chunks, counts.shape[0]))]
+    chunks = [[] for _ in heap]
+    for i in np.argsort(-cost, kind='stable'):
+        total, j = heapq.heappop(heap)
+        chunks[j].append(i)
+        heapq.heappush(heap, (total + cost[i], j))
+
+    return [np.sort(chunk) for chunk in chunks]
+
+
+def _group_dates(trx, idname='account'):
+    """Sort the dates of the transactions by account in a single pass
+
+    Parameters
+    ----------
+    trx : pd.DataFrame of the transactions
+
+    idname : name of the column with the account ids
+
+    Returns
+    -------
+    accounts : array-like of shape = [n_accounts] of account ids, in order of appearance
+
+    dates : array-like of shape = [n_samples] of 'datetime64[ns]' sorted by account
+
+    offsets : array-like of shape = [n_accounts + 1]
+        the dates of accounts[i] are dates[offsets[i]:offsets[i + 1]]
+
+    """
+    codes, accounts = pd.factorize(trx[idname])
+
+    dates = _local_dates(trx['date']).to_numpy(dtype='datetime64[ns]')
+
+    order = np.argsort(codes, kind='stable')
+    offsets = np.zeros(accounts.shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=accounts.shape[0]), out=offsets[1:])
+
+    return np.asarray(accounts), dates[order], offsets
+
+
+def _last_dates(dates, offsets):
+    """Last date of each account of _group_dates, whatever the order of the transactions"""
+    if offsets.shape[0] == 1:
+        return dates[:0]
+    return np.maximum.reduceat(dates, offsets[:-1])
+
+
+def _local_dates(dates):
+    """pd.Series of tz-naive 'datetime64[ns]' dates in local time
+
+    Parameters
+    ----------
+    dates : pd.Series of dates, tz-aware, tz-naive or strings
+
+    Returns
+    -------
+    dates : pd.Series
+
+    """
+    dates = pd.to_datetime(dates)
+    if dates.dt.tz is not None:
+        # Keep the local time
+        dates = dates.dt.tz_localize(None)
+    return dates.astype('datetime64[ns]')
+
+
 def _train_time_periodic_account(dates, n=256,
                                  time_segments=('hour', 'dayweek', 'daymonth')):
     """Evaluate the time periodic risk of a set of dates
@@ -50,32 +639,62 @@ def _train_time_periodic_account(dates, n=256,
 
     Returns
     -------
-    risks : pd.DataFrame of shape = [3, n + 1]
+    risks : pd.DataFrame of shape = [3, n + 2]
         where the rows are the different time segments ['hour', 'dayweek', 'daymonth']
         the columns are the n points of the kernel and the confidence of the kernel
 
     """
 
-    # Create the DataFrame to store the results
-    risks = pd.DataFrame(np.nan, index=time_segments,
-                         columns=['Risk_p' + str(i) for i in range(n)] +
-                                 ['Risk_confidence', 'bw'])
+    risks = _time_periodic_risks(dates, n=n, time_segments=time_segments)
+
+    return _risks_frame(risks, n=n, time_segments=time_segments)
 
-    for time_segment in time_segments:
 
-        radians = _date2rad(dates, time_segment=time_segment).to_list()
+def _time_periodic_risks(dates, n=256,
+                         time_segments=('hour', 'dayweek', 'daymonth'), warm_start=None):
+    """Array version of _train_time_periodic_account
+
+    dates : array-like of shape = [n_samples] of 'datetime64[ns]' dates.
+
+    warm_start : array-like of shape = [len(time_segments)], optional
+        bandwidths used as warm start of bwEstimation, NaN for none
+
+    Returns
+    -------
+    risks : array-like of shape = [3, n + 2]
+
+    """
+
+    # Array to store the results
+    risks = np.full((len(time_segments), n + 2), np.nan)
+
+    radians_all = _dates2rad(dates, time_segments=time_segments)
+
+    for i, time_segment in enumerate(time_segments):
+
+        radians = radians_all[i]
 
         # Find bw
-        bw = bwEstimation(radians, upper=500)
+        if warm_start is None or np.isnan(warm_start[i]):
+            bw = bwEstimation(radians, upper=500)
+        else:
+            bw = bwEstimation(radians, upper=500, warm_start=warm_start[i])
 
         # Estimate kernel
-        y = kernel(radians, bw=bw, n=n)
+        y = kernel(radians, bw=bw, n=n, method='fft')
 
         # Test the kernel
         p = kuiper_two(radians, y)
 
-        risks.loc[time_segment].iloc[:-2] = np.round((1 - (y / y.max())) * 100)
-        risks.loc[time_segment].iloc[-2] = p
-        risks.loc[time_segment].iloc[-1] = bw
+        risks[i, :-2] = np.round((1 - (y / y.max())) * 100)
+        risks[i, -2] = p
+        risks[i, -1] = bw
+
+    return risks
+
 
-    return risks
\ No newline at end of file
+def _risks_frame(risks, n=256, time_segments=('hour', 'dayweek', 'daymonth')):
+    """pd.DataFrame with the rows and columns of _train_time_periodic_account"""
+    return pd.DataFrame(risks, index=time_segments,
+                        columns=['Risk_p' + str(i) for i in range(n)] +
+                                ['Risk_confidence', 'bw'])
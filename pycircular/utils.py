@@ -1,22 +1,30 @@
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
 
 
-def date2rad(dates, time_segment='hour'):
+def date2rad(dates, time_segment='hour', dtype=None, out=None):
     """Convert hours to radians
 
     Parameters
     ----------
-    dates : array-like of shape = [n_samples] of hours.
+    dates : scalar or array-like of shape = [n_samples] of hours.
         Where the decimal point represent minutes / 60 + seconds / 60 / 100 ...
         0 <= times[:] <= 24
+        Lists, np.ndarray and pd.Series are accepted, the last two without copy.
 
     time_segment: string of values ['hour', 'dayweek', 'daymonth']
 
+    dtype : dtype of the radians, e.g. np.float32. Defaults to the dtype of out or np.float64
+
+    out : np.ndarray of shape = [n_samples], optional
+        Array where the radians are written
+
     Returns
     -------
-    radians : array-like of shape = [n_samples]
-        Calculated radians
+    radians : np.ndarray of shape = [n_samples]
+        Calculated radians in [0, 2*pi)
 
     Examples
     --------
@@ -28,40 +36,39 @@ def date2rad(dates, time_segment='hour'):
 
     """
 
+    dates = np.asarray(dates)
+    if dtype is None:
+        dtype = out.dtype if out is not None else np.float64
+
     if time_segment == 'hour':
 
-        radians = dates * 2 * np.pi / 24
+        radians = np.multiply(dates, - 2 * np.pi / 24, out=out, dtype=dtype)
 
         # Fix to rotate the clock and move PI / 2
         # https://en.wikipedia.org/wiki/Clock_angle_problem
 
-        radians = - radians + np.pi/2
+        radians += np.pi/2
 
     elif time_segment == 'dayweek':
 
         # Day of week goes counter-clockwise
-        radians = dates * 2 * np.pi / 7 + np.pi/2
+        radians = np.multiply(dates, 2 * np.pi / 7, out=out, dtype=dtype)
+        radians += np.pi/2
 
     elif time_segment == 'daymonth':
 
         # Day of month goes counter-clockwise
-        radians = dates * 2 * np.pi / 31 + np.pi/2
+        radians = np.multiply(dates, 2 * np.pi / 31, out=out, dtype=dtype)
+        radians += np.pi/2
         # TODO: check what to do with last day of month
 
-    # Change to be in [0, 2*pi]
-    radians1 = []
-    for i in radians:
-        if(i<0):
-            radians1.append(i+2*np.pi)
-        
-        elif(i>(2*np.pi)):
-            radians1.append(i-2*np.pi)
-        
-        else:
-            radians1.append(i) 
-        
+    else:
+        raise ValueError("time_segment must be one of ['hour', 'dayweek', 'daymonth']")
 
-    return radians1
+    # Change to be in [0, 2*pi)
+    radians = np.mod(radians, 2 * np.pi, out=radians if radians.ndim else None)
+
+    return radians
 
 
 def _date2rad(dates, time_segment='hour'):
@@ -127,6 +134,132 @@ def _date2rad(dates, time_segment='hour'):
     return radians
 
 
+def _dates2rad(dates, time_segments=('hour', 'dayweek', 'daymonth'), utc_offset=None, dtype=np.float64):
+    """Convert dates to radians for several time segments in a single pass
+
+    Same as pycircular.utils._date2rad, computed with integer arithmetic on the
+    int64 nanoseconds since epoch instead of the pandas .dt accessors.
+
+    Parameters
+    ----------
+    dates : array-like of shape = [n_samples] of dates in format 'datetime64'.
+        np.ndarray, pd.Series or pd.DatetimeIndex. tz-aware dates are taken in their local time
+
+    time_segments : tuple of strings of values ['hour', 'dayweek', 'daymonth']
+
+    utc_offset : int or array-like of shape = [n_samples] of seconds, optional
+        Offset added to the dates, e.g. to convert UTC dates to local time.
+        Per account offsets can be given as account_offsets[account_codes]
+
+    dtype : dtype of the radians
+
+    Returns
+    -------
+    radians : np.ndarray of shape = [len(time_segments), n_samples]
+        Calculated radians in [0, 2*pi), NaN for NaT
+
+    Examples
+    --------
+    >>> import pandas as pd
+    >>> from pycircular.utils import _dates2rad
+    >>> dates = pd.to_datetime(["2013-10-02 19:10:00", "2013-10-21 19:00:00", "2013-10-24 3:00:00"])
+    >>> radians = _dates2rad(dates, utc_offset=-5 * 3600)
+
+    """
+    seconds, nat = _epoch_seconds(dates, utc_offset)
+
+    days = seconds // 86400
+    # Hours of the day, where the decimal point represent minutes / 60 + seconds / 60 / 60
+    times = (seconds - days * 86400) / 3600
+
+    radians = np.empty((len(time_segments), seconds.shape[0]), dtype=dtype)
+    for i, time_segment in enumerate(time_segments):
+
+        if time_segment == 'hour':
+            # Fix to rotate the clock and move PI / 2
+            radians[i] = - times * 2 * np.pi / 24 + np.pi / 2
+
+        elif time_segment == 'dayweek':
+            # 1970-01-01 is a Thursday, Monday=0, Sunday=6
+            radians[i] = ((days + 3) % 7 + times / 24) * 2 * np.pi / 7 + np.pi / 2
+
+        elif time_segment == 'daymonth':
+            radians[i] = (_day_of_month(days, nat) + times / 24) * 2 * np.pi / 31 + np.pi / 2
+
+        else:
+            raise ValueError("time_segment must be one of ['hour', 'dayweek', 'daymonth']")
+
+    # Change to be in range [0, 2*pi)
+    np.mod(radians, 2 * np.pi, out=radians)
+    if nat.any():
+        radians[:, nat] = np.nan
+
+    return radians
+
+
+def _epoch_seconds(dates, utc_offset=None):
+    """Seconds since epoch of dates, the fraction of second is ignored
+
+    Parameters
+    ----------
+    dates : array-like of shape = [n_samples] of dates in format 'datetime64'.
+        np.ndarray, pd.Series or pd.DatetimeIndex. tz-aware dates are taken in their local time
+
+    utc_offset : int or array-like of shape = [n_samples] of seconds, optional
+
+    Returns
+    -------
+    seconds : np.ndarray of shape = [n_samples] of int64
+
+    nat : np.ndarray of shape = [n_samples] of bool, whether the date is NaT
+
+    """
+    if isinstance(dates, pd.Series):
+        dates = pd.DatetimeIndex(dates)
+    if isinstance(dates, pd.DatetimeIndex) and dates.tz is not None:
+        dates = dates.tz_localize(None)
+
+    ns = np.asarray(dates).astype('datetime64[ns]').view(np.int64)
+    nat = ns == np.iinfo(np.int64).min
+
+    seconds = ns // 10 ** 9
+    if utc_offset is not None:
+        seconds = seconds + np.asarray(utc_offset, dtype=np.int64)
+
+    return seconds, nat
+
+
+@lru_cache(maxsize=None)
+def _day_of_month_table():
+    """Day of the month of the days since epoch between 1900 and 2100
+
+    Returns
+    -------
+    first_day : int, days since epoch of the first entry
+
+    table : np.ndarray of uint8
+    """
+    days = np.arange(np.datetime64('1900-01-01'), np.datetime64('2100-01-01'))
+    table = (days - days.astype('datetime64[M]').astype('datetime64[D]')).astype(np.uint8) + 1
+    return days[0].astype(np.int64), table
+
+
+def _day_of_month(days, nat=None):
+    """Day of the month, starting from 1, of int64 days since epoch
+
+    The days where nat, e.g. of NaT dates, are set to the first day of the table,
+    so that they do not fall back to the slow path, and must be masked by the caller
+    """
+    first_day, table = _day_of_month_table()
+    if nat is not None and nat.any():
+        days = np.where(nat, first_day, days)
+    idx = days - first_day
+    if idx.shape[0] and (idx.min() < 0 or idx.max() >= table.shape[0]):
+        days = days.astype('datetime64[D]')
+        return (days - days.astype('datetime64[M]').astype('datetime64[D]')).astype(np.int64) + 1
+    return table[idx]
+
+
 def freq_time(dates, time_segment='hour', freq=True, continious=True):
     """Calculate frequency per time period and calculate continius time period
 
@@ -196,3 +329,71 @@ def freq_time(dates, time_segment='hour', freq=True, continious=True):
         return freq_arr, times
     else:
         return freq_arr, time_temp
+
+
+def freq_time_bins(dates, time_segment='hour', groups=None, normalize=True, utc_offset=None):
+    """Calculate the frequency per time period as dense, ordered vectors
+
+    Fast version of pycircular.utils.freq_time using np.bincount, where the
+    frequencies are ordered by time period instead of by frequency.
+
+    Parameters
+    ----------
+    dates : array-like of shape = [n_samples] of dates in format 'datetime64'.
+
+    time_segment: string of values ['hour', 'dayweek', 'daymonth']
+
+    groups : array-like of shape = [n_samples] of keys, e.g. account ids, optional
+        If given, the frequencies are calculated for each group
+
+    normalize : bool, whether to return frequencies in percentage instead of counts
+
+    utc_offset : int or array-like of shape = [n_samples] of seconds, optional,
+        see pycircular.utils._dates2rad
+
+    Returns
+    -------
+    freq : np.ndarray of shape = [n_bins], n_bins being 24, 7 or 31 for
+        hours 0 to 23, days of week Monday=0 to Sunday=6, or days of month 1 to 31.
+        If groups is given, of shape = [n_groups, n_bins]
+
+    keys : np.ndarray of shape = [n_groups] of the groups of each row of freq,
+        only if groups is given
+
+    Examples
+    --------
+    >>> import pandas as pd
+    >>> from pycircular.utils import freq_time_bins
+    >>> dates = pd.to_datetime(["2013-10-02 19:10:00", "2013-10-21 19:00:00", "2013-10-24 3:00:00"])
+    >>> freq = freq_time_bins(dates, time_segment='hour')
+    >>> freq, keys = freq_time_bins(dates, time_segment='dayweek', groups=[1, 1, 2])
+
+    """
+    seconds, nat = _epoch_seconds(dates, utc_offset)
+    days = seconds // 86400
+
+    if time_segment == 'hour':
+        bins, n_bins = (seconds - days * 86400) // 3600, 24
+    elif time_segment == 'dayweek':
+        # 1970-01-01 is a Thursday, Monday=0, Sunday=6
+        bins, n_bins = (days + 3) % 7, 7
+    elif time_segment == 'daymonth':
+        bins, n_bins = _day_of_month(days, nat) - 1, 31
+    else:
+        raise ValueError("time_segment must be one of ['hour', 'dayweek', 'daymonth']")
+
+    if groups is None:
+        freq = np.bincount(bins[~nat], minlength=n_bins).astype(float)
+        if normalize and freq.sum():
+            freq /= freq.sum()
+        return freq
+
+    codes, keys = pd.factorize(np.asarray(groups))
+    valid = ~nat & (codes >= 0)
+    freq = np.bincount(codes[valid] * n_bins + bins[valid],
+                       minlength=keys.shape[0] * n_bins).reshape(keys.shape[0], n_bins).astype(float)
+    if normalize:
+        total = freq.sum(axis=1, keepdims=True)
+        np.divide(freq, total, out=freq, where=total > 0)
+
+    return freq, np.asarray(keys)